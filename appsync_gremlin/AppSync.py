@@ -1,20 +1,80 @@
-from typing import Dict, Any, Callable, Optional, Union, List, Tuple
+from typing import Dict, Any, Callable, Optional, Union, List, Tuple, TypeVar
+from concurrent.futures import ThreadPoolExecutor
 from logging import Logger
+import functools
+import time
 
 from gremlin_python.driver.driver_remote_connection import DriverRemoteConnection
+from gremlin_python.driver.remote_connection import RemoteConnection
 from gremlin_python.process.graph_traversal import GraphTraversal
 from gremlin_python.process.anonymous_traversal import traversal
 
 from appsync_gremlin.resolver.Resolver import ResolverFunction
 from appsync_gremlin.resolver.ResolverInput import ResolverInput
+from appsync_gremlin.filter.Filter import compile_filter
 from appsync_gremlin.helpers.Exceptions import AppSyncException
+from appsync_gremlin.helpers.Cache import cache_key
+from appsync_gremlin.helpers.SingleFlight import SingleFlight
+from appsync_gremlin.connection.SlowQueryLog import SlowQueryLog
+from appsync_gremlin.connection.Limiter import ConcurrencyLimiter, CircuitBreaker, GuardedRemoteConnection
+from appsync_gremlin.connection.Driver import ReconnectingRemoteConnection
+
+
+# Payloads of scheduled warm-up invocations, e.g. {"warm_up": true} or those of serverless-plugin-warmup.
+WARM_UP_KEY = "warm_up"
+WARM_UP_SOURCES = {"serverless-plugin-warmup"}
+
+
+Item = TypeVar("Item")
+
+
+def raise_error(error: Exception) -> Any:
+    raise error
+
+
+def is_warm_up(payload: Any) -> bool:
+
+    if not isinstance(payload, dict):
+        return False
+
+    # The source of a resolver payload is the parent object (a dict), only the source of a warm-up payload is a str.
+    source = payload.get("source")
+
+    return payload.get(WARM_UP_KEY) is True or (isinstance(source, str) and source in WARM_UP_SOURCES)
 
 
 class AppSync:
 
-    def __init__(self, connection_config: Dict, logger: Optional[Logger] = None):
+    def __init__(
+            self,
+            connection_config: Dict,
+            logger: Optional[Logger] = None,
+            fuse_batches: bool = False,
+            fused_batch_size: int = 100,
+            remote_connection: Optional[RemoteConnection] = None,
+            slow_query_log: Optional[SlowQueryLog] = None,
+            single_flight: bool = False,
+            single_flight_identity: bool = True,
+            concurrency_limiter: Optional[ConcurrencyLimiter] = None,
+            circuit_breaker: Optional[CircuitBreaker] = None
+    ):
         """
 
+        :param connection_config: (Dict)
+        :param logger: (Logger|None)
+        :param fuse_batches: If True, the independent read resolvers of a BatchInvoke payload are fused into
+                             a single traversal with one branch per item. (bool)
+        :param fused_batch_size: The maximum number of branches fused into a single traversal. (int)
+        :param remote_connection: If set, traversals are submitted to this remote connection
+                                  (e.g. a LocalRemoteConnection) instead of the Neptune cluster. (RemoteConnection|None)
+        :param slow_query_log: If set, every submitted traversal is recorded in the slow query log. (SlowQueryLog|None)
+        :param single_flight: If True, identical read resolver inputs are resolved once, both within a BatchInvoke
+                              payload and across concurrent requests in the same container. (bool)
+        :param single_flight_identity: If True, the identity is part of what makes resolver inputs identical. (bool)
+        :param concurrency_limiter: If set, the read items of a BatchInvoke payload are resolved concurrently and
+                                    the traversals in flight are bounded by the adaptive concurrency limiter.
+                                    (ConcurrencyLimiter|None)
+        :param circuit_breaker: If set, traversals fail fast after repeated failures. (CircuitBreaker|None)
         """
 
         self._connection_method = connection_config.get("connection_method")
@@ -22,22 +82,123 @@ class AppSync:
         self._neptune_cluster_port = connection_config.get("neptune_cluster_port")
         self._logger = logger
 
+        self._fuse_batches = fuse_batches
+        self._fused_batch_size = fused_batch_size
+        self._remote_connection = remote_connection
+        self._slow_query_log = slow_query_log
+        self._single_flight = SingleFlight() if single_flight else None
+        self._single_flight_identity = single_flight_identity
+        self._concurrency_limiter = concurrency_limiter
+        self._circuit_breaker = circuit_breaker
+
+        self._driver_remote_connection = None
         self._resolvers = {}
 
+    def _get_remote_connection(self) -> RemoteConnection:
+        """
+
+        :return:
+        """
+
+        if self._remote_connection is not None:
+            return self._remote_connection
+
+        # The driver connection (and its pool) is reused by the invocations of the container
+        # and reopened after a connection error.
+        if self._driver_remote_connection is None:
+            url = "{0}://{1}:{2}/gremlin".format(
+                self._connection_method,
+                self._neptune_cluster_endpoint,
+                self._neptune_cluster_port
+            )
+
+            self._driver_remote_connection = ReconnectingRemoteConnection(
+                url, "g", lambda: DriverRemoteConnection(url, "g"), self._logger
+            )
+
+        return self._driver_remote_connection
+
     def _get_traversal(self) -> GraphTraversal:
         """
 
         :return:
         """
 
-        remote_connection = DriverRemoteConnection("{0}://{1}:{2}/gremlin".format(
-            self._connection_method,
-            self._neptune_cluster_endpoint,
-            self._neptune_cluster_port
-        ), "g")
+        remote_connection = self._get_remote_connection()
+
+        if self._concurrency_limiter is not None or self._circuit_breaker is not None:
+            remote_connection = GuardedRemoteConnection(
+                remote_connection, self._concurrency_limiter, self._circuit_breaker
+            )
+
+        if self._slow_query_log is not None:
+            remote_connection = self._slow_query_log.wrap(remote_connection)
 
         return traversal().withRemote(remote_connection)
 
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Returns the state of the concurrency limiter, circuit breaker and slow query log (if set).
+
+        :return: (Dict)
+        """
+
+        metrics = {}
+
+        if self._concurrency_limiter is not None:
+            metrics["concurrency_limiter"] = self._concurrency_limiter.snapshot()
+
+        if self._circuit_breaker is not None:
+            metrics["circuit_breaker"] = self._circuit_breaker.snapshot()
+
+        if self._slow_query_log is not None:
+            metrics["slow_queries"] = self._slow_query_log.stats()
+
+        return metrics
+
+    def warm_up(self) -> Dict[str, Any]:
+        """
+        Warms the container up ahead of its first request: opens the remote connection, builds the filter trees
+        of the registered resolvers and runs a cheap probe traversal (which also warms the serialization code paths).
+
+        :return: A report of what was warmed. (Dict)
+        """
+
+        start = time.perf_counter()
+        compiled = set()
+
+        for resolver in self._resolvers.values():
+            filter_func = getattr(resolver, "filter", None)
+
+            if filter_func is not None:
+                compile_filter(filter_func, compiled)
+
+        report = {
+            "resolvers": len(self._resolvers),
+            "filters": len(compiled),
+            "connection": False,
+            "probe_ms": None
+        }
+
+        try:
+            probe_start = time.perf_counter()
+            self._get_traversal().V().limit(1).count().next()
+
+            report["connection"] = True
+            report["probe_ms"] = (time.perf_counter() - probe_start) * 1000
+        except Exception as e:
+            report["error"] = str(e)
+
+            if self._logger:
+                self._logger.warning("The warm-up probe traversal failed.", exc_info=True)
+
+        report["duration_ms"] = (time.perf_counter() - start) * 1000
+
+        if self._logger:
+            self._logger.info("Warmed up: %s", report)
+
+        return report
+
     def add_resolver(self, resolver_identifier: Tuple[str, str], resolver: ResolverFunction) -> None:
         """
 
@@ -47,19 +208,64 @@ class AppSync:
 
         self._resolvers[resolver_identifier] = resolver
 
+    def _single_flight_key(self, resolver_input: ResolverInput) -> Optional[str]:
+        """
+        Returns the key identifying the resolver input for single-flight deduplication, or None if
+        single-flight is disabled or the resolver is not a read resolver (e.g. a mutation).
+
+        :param resolver_input: (ResolverInput)
+        :return: (str|None)
+        """
+
+        if self._single_flight is None:
+            return None
+
+        resolver = self._resolvers.get((resolver_input.type_name, resolver_input.field_name))
+
+        if not getattr(resolver, "read_only", False):
+            return None
+
+        return cache_key(
+            resolver_input.type_name,
+            resolver_input.field_name,
+            resolver_input.arguments,
+            resolver_input.source,
+            resolver_input.identity if self._single_flight_identity else None
+        )
+
     def _handle_resolver(self, resolver_input: ResolverInput) -> Any:
 
+        resolver = self._resolvers[(resolver_input.type_name, resolver_input.field_name)]
+        key = self._single_flight_key(resolver_input)
+
+        if key is None:
+            return self._handle(resolver_input, lambda: resolver(self._get_traversal(), resolver_input))
+
+        return dict(self._single_flight.do(
+            key, lambda: self._handle(resolver_input, lambda: resolver(self._get_traversal(), resolver_input))
+        ))
+
+    def _handle(self, resolver_input: ResolverInput, resolve: Callable[[], Any]) -> Any:
+        """
+        Builds the response of a resolver input from the data returned by resolve, mapping
+        any raised exceptions to the response error.
+
+        :param resolver_input: (ResolverInput)
+        :param resolve: (Callable)
+        :return: (Any)
+        """
+
         if self._logger:
-            self._logger.info("The resolver input is {}".format(str(resolver_input)))
+            # Formatted lazily, i.e. only if the record is emitted at the logger's level.
+            self._logger.info("The resolver input is %s", resolver_input)
 
         response = {
             "error": None,
             "data": None
         }
 
-        resolver = self._resolvers[(resolver_input.type_name, resolver_input.field_name)]
         try:
-            response["data"] = resolver(self._get_traversal(), resolver_input)
+            response["data"] = resolve()
         except AppSyncException as error:
             response["error"] = error.to_dict()
         except Exception:
@@ -73,10 +279,210 @@ class AppSync:
             }
 
         if self._logger:
-            self._logger.info("The resolver response is {}".format(str(response)))
+            self._logger.info("The resolver response is %s", response)
 
         return response
 
+    def _submit_branches(self, branches: Dict[str, GraphTraversal]) -> Dict[str, Any]:
+        """
+        Submits the branch traversals as a single traversal of the form
+
+            g.inject(0).project(l_1, l_2, ..., l_n).by(b_1).by(b_2). ... .by(b_n)
+
+        where b_1, b_2, ..., b_n are the branches labelled l_1, l_2, ..., l_n.
+
+        :param branches: The branch traversals keyed by their labels. (Dict)
+        :return: The result of each branch keyed by its label. (Dict)
+        """
+
+        traversal = self._get_traversal().inject(0).project(*branches.keys())
+
+        for branch in branches.values():
+            traversal = traversal.by(branch)
+
+        return traversal.next()
+
+    def _is_read_only(self, resolver_input: ResolverInput) -> bool:
+
+        resolver = self._resolvers.get((resolver_input.type_name, resolver_input.field_name))
+
+        return getattr(resolver, "read_only", False)
+
+    def _map(self, func: Callable[[Item], Any], items: List[Item], read_only: bool = True) -> List[Any]:
+        """
+        Applies func to each item. If a concurrency limiter is set (and the items are read only), the items are
+        processed concurrently by as many threads as the current limit, so that the limit adapts the number of
+        traversals a BatchInvoke payload submits at once to the latency of the database.
+
+        :param func: (Callable)
+        :param items: (List)
+        :param read_only: Whether func only submits read traversals. (bool)
+        :return: The results of func, in the order of items. (List)
+        """
+
+        if self._concurrency_limiter is None or not read_only or len(items) < 2:
+            return [func(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=min(len(items), self._concurrency_limiter.limit)) as executor:
+            return list(executor.map(func, items))
+
+    def _handle_fused_batch(self, resolver_inputs: List[ResolverInput]) -> List[Any]:
+        """
+        Handles a BatchInvoke payload by fusing the branches of the resolvers that support it
+        (see vertex_field_resolver and calculated_field_resolver) into as few traversals as possible.
+        The results are demultiplexed back into the ordered response list.
+
+        Items that cannot be fused (resolvers without branches, branches that fail to build or
+        fused traversals that fail) fall back to separate execution.
+
+        :param resolver_inputs: (List[ResolverInput])
+        :return: (List[Any])
+        """
+
+        branches = {}
+
+        for index, resolver_input in enumerate(resolver_inputs):
+            resolver = self._resolvers.get((resolver_input.type_name, resolver_input.field_name))
+            branch = getattr(resolver, "branch", None)
+
+            if branch is None:
+                continue
+
+            try:
+                branches[str(index)] = branch(resolver_input)
+            except Exception:
+                if self._logger:
+                    self._logger.debug("Unable to build the branch of item %s.", index, exc_info=True)
+
+        labels = list(branches.keys())
+        chunks = [
+            labels[start:start + self._fused_batch_size] for start in range(0, len(labels), self._fused_batch_size)
+        ]
+        results = {}
+
+        def submit_chunk(chunk: List[str]) -> Dict[str, Any]:
+
+            if len(chunk) < 2:
+                return {}
+
+            try:
+                return self._submit_branches({label: branches[label][0] for label in chunk})
+            except Exception:
+                if self._logger:
+                    self._logger.warning(
+                        "The fused traversal failed, falling back to separate execution.", exc_info=True
+                    )
+
+                return {}
+
+        for chunk_results in self._map(submit_chunk, chunks):
+            results.update(chunk_results)
+
+        def handle(index: int) -> Any:
+
+            label = str(index)
+
+            if label in results:
+                return self._handle(resolver_inputs[index], lambda: branches[label][1](results[label]))
+
+            return self._handle_resolver(resolver_inputs[index])
+
+        return self._map(
+            handle, list(range(len(resolver_inputs))), all(map(self._is_read_only, resolver_inputs))
+        )
+
+    def _handle_deduplicated_batch(self, resolver_inputs: List[ResolverInput]) -> List[Any]:
+        """
+        Handles a BatchInvoke payload, resolving identical read resolver inputs once
+        and fanning the response out to each of them.
+
+        :param resolver_inputs: (List[ResolverInput])
+        :return: (List[Any])
+        """
+
+        unique_inputs = []
+        unique_indices = {}
+        indices = []
+
+        for resolver_input in resolver_inputs:
+            key = self._single_flight_key(resolver_input)
+
+            if key is None or key not in unique_indices:
+                if key is not None:
+                    unique_indices[key] = len(unique_inputs)
+
+                indices.append(len(unique_inputs))
+                unique_inputs.append(resolver_input)
+            else:
+                indices.append(unique_indices[key])
+
+        if self._logger and len(unique_inputs) < len(resolver_inputs):
+            self._logger.info(
+                "Deduplicated %s of %s batch items.", len(resolver_inputs) - len(unique_inputs), len(resolver_inputs)
+            )
+
+        responses = self._handle_batch(unique_inputs)
+
+        return [dict(responses[index]) for index in indices]
+
+    def _handle_batch(self, resolver_inputs: List[ResolverInput]) -> List[Any]:
+        """
+        Handles a BatchInvoke payload. The items whose resolvers support batching (see aggregate_field_resolver)
+        are grouped by resolver and each group is resolved by a single call. The remaining items are
+        either fused (if fuse_batches is set) or resolved separately.
+
+        :param resolver_inputs: (List[ResolverInput])
+        :return: (List[Any])
+        """
+
+        responses = [None] * len(resolver_inputs)
+        groups = {}
+        remaining = []
+
+        for index, resolver_input in enumerate(resolver_inputs):
+            resolver_identifier = (resolver_input.type_name, resolver_input.field_name)
+
+            if hasattr(self._resolvers.get(resolver_identifier), "batch"):
+                groups.setdefault(resolver_identifier, []).append(index)
+            else:
+                remaining.append(index)
+
+        def resolve_group(group: Tuple[Tuple[str, str], List[int]]) -> Tuple[List[Any], Optional[Exception]]:
+
+            resolver_identifier, indices = group
+
+            try:
+                return self._resolvers[resolver_identifier].batch(
+                    self._get_traversal(), [resolver_inputs[index] for index in indices]
+                ), None
+            except Exception as error:
+                return [None] * len(indices), error
+
+        group_values = self._map(resolve_group, list(groups.items()))
+
+        for indices, (values, batch_error) in zip(groups.values(), group_values):
+            for index, value in zip(indices, values):
+                # The error of the whole batch, or that of the item.
+                error = batch_error or (value if isinstance(value, Exception) else None)
+
+                responses[index] = self._handle(
+                    resolver_inputs[index], functools.partial(raise_error, error) if error else lambda: value
+                )
+
+        remaining_inputs = [resolver_inputs[index] for index in remaining]
+
+        if self._fuse_batches:
+            remaining_responses = self._handle_fused_batch(remaining_inputs)
+        else:
+            remaining_responses = self._map(
+                self._handle_resolver, remaining_inputs, all(map(self._is_read_only, remaining_inputs))
+            )
+
+        for index, response in zip(remaining, remaining_responses):
+            responses[index] = response
+
+        return responses
+
     def lambda_handler(self) -> Callable:
         """
 
@@ -93,32 +499,27 @@ class AppSync:
 
             We will use these two cases to decide how we handle our resolvers.
 
+            A scheduled warm-up payload (see is_warm_up) warms the container up instead.
+
             :param payload: (list|dict)
             :param context: (Any)
             :return: (Any)
             """
 
+            if is_warm_up(payload):
+                return self.warm_up()
+
             # If the BatchInvoke operation is used.
             if isinstance(payload, list):
 
-                return [
-                    self._handle_resolver(ResolverInput(
-                        type_name=resolver_input.get("type_name"),
-                        field_name=resolver_input.get("field_name"),
-                        arguments=resolver_input.get("arguments"),
-                        identity=resolver_input.get("identity"),
-                        source=resolver_input.get("source")
-                    ))
-                    for resolver_input in payload
-                ]
+                resolver_inputs = [ResolverInput.from_payload(resolver_input) for resolver_input in payload]
+
+                if self._single_flight is not None:
+                    return self._handle_deduplicated_batch(resolver_inputs)
+
+                return self._handle_batch(resolver_inputs)
 
             # If the Invoke operation is used
-            return self._handle_resolver(ResolverInput(
-                type_name=payload.get("type_name"),
-                field_name=payload.get("field_name"),
-                arguments=payload.get("arguments"),
-                identity=payload.get("identity"),
-                source=payload.get("source")
-            ))
+            return self._handle_resolver(ResolverInput.from_payload(payload))
 
         return handler
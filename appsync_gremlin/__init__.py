@@ -2,8 +2,9 @@ from appsync_gremlin.helpers import AppSyncException
 from appsync_gremlin.resolver import (
     TraversalFilterFunction, VertexListFieldResolverFunction, VertexFieldResolverFunction,
     CalculatedFieldResolverFunction,
-    ResolverFunction,
-    vertex_field_resolver, vertex_list_field_resolver, calculated_field_resolver, mutation_resolver,
+    ResolverFunction, BranchFunction, DecodeFunction, BatchResolverFunction, SourceIdFunction, CacheKeyFunction,
+    vertex_field_resolver, vertex_list_field_resolver, calculated_field_resolver, aggregate_field_resolver,
+    mutation_resolver,
     ResolverInput,
     format_value_map, format_key, format_value
 )
@@ -12,5 +13,12 @@ from appsync_gremlin.filter import (
     RelationshipDirection, scalar_filter, vertex_filter, relationship_filter,
     TraversalFilterFunction, Relationship, FilterFunction, NameFunction,
     id_filter, string_filter, int_filter, float_filter, date_time_filter, boolean_filter, enum_filter,
-    name, EdgeDirection, edge_filter
+    name, EdgeDirection, edge_filter, compile_filter
+)
+from appsync_gremlin.sort import SortDirection, vertex_sort, TraversalSortFunction, SortFieldsFunction
+from appsync_gremlin.facet import vertex_facets, TraversalFacetFunction, FacetFieldsFunction
+from appsync_gremlin.cost import CostBudget, QueryCost, estimate_cost
+from appsync_gremlin.connection import (
+    LocalGraph, LocalRemoteConnection, LocalGraphException, SlowQueryLog,
+    ConcurrencyLimiter, CircuitBreaker, CircuitState
 )
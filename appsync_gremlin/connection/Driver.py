@@ -0,0 +1,88 @@
+from typing import Callable, Optional
+from logging import Logger
+from threading import Lock
+
+from gremlin_python.driver.remote_connection import RemoteConnection, RemoteTraversal
+from gremlin_python.process.traversal import Bytecode
+
+from appsync_gremlin.helpers.Exceptions import is_connection_error
+from appsync_gremlin.connection.SlowQueryLog import is_mutation
+
+
+ConnectFunction = Callable[[], RemoteConnection]
+
+
+class ReconnectingRemoteConnection(RemoteConnection):
+
+    def __init__(self, url: str, traversal_source: str, connect: ConnectFunction, logger: Optional[Logger] = None):
+        """
+        A remote connection that opens its underlying connection (using connect) on the first traversal and reuses it
+        for the following ones. If a traversal fails with a connection error (e.g. the server closed an idle websocket,
+        or the socket went stale while the container was frozen), the connection is closed and reopened by the next
+        traversal. Read traversals are retried once on a new connection, mutations are not (they may have been applied).
+
+        :param url: (str)
+        :param traversal_source: (str)
+        :param connect: Opens the underlying connection. (ConnectFunction)
+        :param logger: (Logger|None)
+        """
+
+        super().__init__(url, traversal_source)
+
+        self._connect = connect
+        self._logger = logger
+
+        self._remote_connection = None
+        self._lock = Lock()
+
+    def _get_remote_connection(self) -> RemoteConnection:
+
+        with self._lock:
+            if self._remote_connection is None:
+                self._remote_connection = self._connect()
+
+            return self._remote_connection
+
+    def _reset(self, remote_connection: RemoteConnection) -> None:
+
+        with self._lock:
+            # Another thread may have already reopened the connection.
+            if self._remote_connection is not remote_connection:
+                return
+
+            self._remote_connection = None
+
+        try:
+            remote_connection.close()
+        except Exception:
+            if self._logger:
+                self._logger.debug("Unable to close the remote connection.", exc_info=True)
+
+    def submit(self, bytecode: Bytecode) -> RemoteTraversal:
+
+        for attempt in range(2):
+            remote_connection = self._get_remote_connection()
+
+            try:
+                return remote_connection.submit(bytecode)
+            except Exception as e:
+                if not is_connection_error(e):
+                    raise
+
+                if self._logger:
+                    self._logger.warning("The remote connection failed, reopening it.", exc_info=True)
+
+                self._reset(remote_connection)
+
+                if attempt or is_mutation(bytecode):
+                    raise
+
+    def is_closed(self) -> bool:
+        return self._remote_connection is None
+
+    def close(self) -> None:
+
+        remote_connection = self._remote_connection
+
+        if remote_connection is not None:
+            self._reset(remote_connection)
@@ -0,0 +1,304 @@
+from typing import Dict, Any, Optional
+from enum import Enum
+from threading import Lock, Condition
+import time
+
+from gremlin_python.driver.remote_connection import RemoteConnection, RemoteTraversal
+from gremlin_python.process.traversal import Bytecode
+
+from appsync_gremlin.helpers.Exceptions import AppSyncException, is_unavailable_error
+
+
+### Concurrency limiter
+
+
+class ConcurrencyLimiter:
+
+    def __init__(
+            self,
+            initial_limit: int = 10,
+            min_limit: int = 1,
+            max_limit: int = 100,
+            latency_threshold: float = 1000,
+            backoff: float = 0.75,
+            smoothing: float = 0.2,
+            max_wait: float = 1
+    ):
+        """
+        Adaptive (AIMD) concurrency limiter constructor. The limiter tracks the traversals in flight and
+        adjusts its limit to the latency it observes:
+
+            - a traversal that succeeds within latency_threshold increases the limit by 1 / limit
+              (i.e. by about 1 for every limit successful traversals),
+            - a traversal that fails or exceeds latency_threshold multiplies the limit by backoff.
+
+        The limit bounds the traversals submitted concurrently through the same AppSync object. The lambda handler
+        resolves the read items of a BatchInvoke payload (and its fused chunks) on as many threads as the current
+        limit, so the limit adapts how many traversals a batch submits at once to the latency of the database.
+        A traversal that finds the limit reached waits for a slot for at most max_wait seconds before being rejected.
+
+        :param initial_limit: (int)
+        :param min_limit: (int)
+        :param max_limit: (int)
+        :param latency_threshold: The latency (in milliseconds) above which the limit is decreased. (float)
+        :param backoff: The multiplicative decrease of the limit. (float)
+        :param smoothing: The smoothing factor of the exponentially weighted average latency. (float)
+        :param max_wait: The maximum time (in seconds) a traversal waits for a slot. (float)
+        """
+
+        self._limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._latency_threshold = latency_threshold
+        self._backoff = backoff
+        self._smoothing = smoothing
+        self._max_wait = max_wait
+
+        self._in_flight = 0
+        self._latency = None
+        self._rejected = 0
+        self._lock = Lock()
+        self._released = Condition(self._lock)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Acquires a slot for a traversal. If the limit is reached, waits for a slot to be released
+        for at most timeout seconds (by default max_wait) and returns False if none was.
+
+        :param timeout: (float|None)
+        :return: (bool)
+        """
+
+        deadline = time.monotonic() + (self._max_wait if timeout is None else timeout)
+
+        with self._lock:
+            while self._in_flight >= int(self._limit):
+                remaining = deadline - time.monotonic()
+
+                if remaining <= 0:
+                    self._rejected += 1
+                    return False
+
+                self._released.wait(remaining)
+
+            self._in_flight += 1
+            return True
+
+    def cancel(self) -> None:
+        """
+        Releases the slot of a traversal that was not submitted, without adjusting the limit.
+
+        :return:
+        """
+
+        with self._lock:
+            self._in_flight -= 1
+            self._released.notify()
+
+    def release(self, latency: float, success: bool) -> None:
+        """
+        Releases the slot of a completed traversal and adjusts the limit.
+
+        :param latency: The latency of the traversal in milliseconds. (float)
+        :param success: (bool)
+        :return:
+        """
+
+        with self._lock:
+            self._in_flight -= 1
+            self._released.notify()
+
+            self._latency = latency if self._latency is None else \
+                self._smoothing * latency + (1 - self._smoothing) * self._latency
+
+            if success and latency <= self._latency_threshold:
+                self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+            else:
+                self._limit = max(self._min_limit, self._limit * self._backoff)
+
+    def snapshot(self) -> Dict[str, Any]:
+
+        with self._lock:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "latency_ms": self._latency,
+                "rejected": self._rejected
+            }
+
+
+### Circuit breaker
+
+
+class CircuitState(Enum):
+    """
+    Circuit breaker state.
+    Supported options are CLOSED, OPEN and HALF_OPEN.
+    """
+
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
+class CircuitBreaker:
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        """
+        Circuit breaker constructor. After failure_threshold consecutive failures the circuit opens and
+        traversals fail fast. Once reset_timeout seconds have elapsed, a single probe traversal is allowed
+        (half-open): the circuit closes if it succeeds and opens again if it fails.
+
+        :param failure_threshold: (int)
+        :param reset_timeout: (float)
+        """
+
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._trips = 0
+        self._lock = Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        Returns whether a traversal may be submitted.
+
+        :return: (bool)
+        """
+
+        with self._lock:
+            if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self._reset_timeout:
+                self._state, self._probing = CircuitState.HALF_OPEN, False
+
+            if self._state == CircuitState.HALF_OPEN:
+                if self._probing:
+                    return False
+
+                self._probing = True
+                return True
+
+            return self._state == CircuitState.CLOSED
+
+    def record_success(self) -> None:
+
+        with self._lock:
+            self._state, self._failures, self._probing = CircuitState.CLOSED, 0, False
+
+    def record_failure(self) -> None:
+
+        with self._lock:
+            self._failures += 1
+
+            if self._state == CircuitState.HALF_OPEN or self._failures >= self._failure_threshold:
+                if self._state != CircuitState.OPEN:
+                    self._trips += 1
+
+                self._state, self._opened_at, self._probing = CircuitState.OPEN, time.monotonic(), False
+
+    def snapshot(self) -> Dict[str, Any]:
+
+        with self._lock:
+            return {
+                "state": self._state.name,
+                "consecutive_failures": self._failures,
+                "trips": self._trips
+            }
+
+
+### Remote connection
+
+
+class GuardedRemoteConnection(RemoteConnection):
+
+    def __init__(
+            self,
+            remote_connection: RemoteConnection,
+            limiter: Optional[ConcurrencyLimiter] = None,
+            breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        A remote connection that submits traversals to remote_connection through a concurrency limiter
+        and a circuit breaker. Rejected traversals fail fast with an AppSyncException of error type
+        CONCURRENCY_LIMIT_EXCEEDED or CIRCUIT_OPEN.
+
+        Only the errors signalling that the server is unavailable (connection errors, timeouts and overloads,
+        see is_unavailable_error) count as failures, errors caused by the traversal itself (e.g. bad client input)
+        do not open the circuit or decrease the limit.
+
+        :param remote_connection: (RemoteConnection)
+        :param limiter: (ConcurrencyLimiter|None)
+        :param breaker: (CircuitBreaker|None)
+        """
+
+        super().__init__(remote_connection.url, remote_connection.traversal_source)
+
+        self._remote_connection = remote_connection
+        self._limiter = limiter
+        self._breaker = breaker
+
+    def submit(self, bytecode: Bytecode) -> RemoteTraversal:
+
+        if self._limiter is not None and not self._limiter.acquire():
+            raise AppSyncException(
+                error_type="CONCURRENCY_LIMIT_EXCEEDED",
+                error_message="Too many concurrent requests. Please try again later.",
+                error_data=self._limiter.snapshot()
+            )
+
+        if self._breaker is not None and not self._breaker.allow():
+            if self._limiter is not None:
+                self._limiter.cancel()
+
+            raise AppSyncException(
+                error_type="CIRCUIT_OPEN",
+                error_message="The database is unavailable. Please try again later.",
+                error_data=self._breaker.snapshot()
+            )
+
+        start = time.perf_counter()
+
+        try:
+            remote_traversal = self._remote_connection.submit(bytecode)
+        except Exception as e:
+            unavailable = is_unavailable_error(e)
+
+            if self._limiter is not None:
+                self._limiter.release((time.perf_counter() - start) * 1000, not unavailable)
+
+            if self._breaker is not None:
+                if unavailable:
+                    self._breaker.record_failure()
+                else:
+                    self._breaker.record_success()
+
+            raise
+
+        if self._limiter is not None:
+            self._limiter.release((time.perf_counter() - start) * 1000, True)
+
+        if self._breaker is not None:
+            self._breaker.record_success()
+
+        return remote_traversal
+
+    def is_closed(self) -> bool:
+        return self._remote_connection.is_closed()
+
+    def close(self) -> None:
+        self._remote_connection.close()
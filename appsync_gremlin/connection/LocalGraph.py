@@ -0,0 +1,1307 @@
+from typing import Dict, Any, Optional, Iterable, Iterator, List, Tuple, Callable
+from itertools import islice, count as counter
+import heapq
+import random
+import time
+
+from gremlin_python.driver.remote_connection import RemoteConnection, RemoteTraversal
+from gremlin_python.process.traversal import (
+    Bytecode, Traverser, TraversalSideEffects, P, T, Order, Scope, Cardinality
+)
+from gremlin_python.structure.graph import Vertex, Edge, Element
+
+
+### Steps
+
+
+class LocalGraphException(Exception):
+    """
+    Raised when a traversal uses a step (or a form of a step) that the local graph does not support.
+    """
+
+
+class Step:
+
+    __slots__ = ("name", "arguments", "modulators")
+
+    def __init__(self, name: str, arguments: List[Any]):
+        """
+        A traversal step, with the modulators (by, from, to) that follow it in the bytecode.
+
+        :param name: The Gremlin step name. (str)
+        :param arguments: The step arguments, with child traversals parsed into lists of steps. (List)
+        """
+
+        self.name = name
+        self.arguments = arguments
+        self.modulators = []
+
+
+MODULATORS = {"by", "from", "to", "with"}
+
+INDEXED_FILTERS = {"has", "hasLabel", "hasId", "filter"}
+
+
+def parse(bytecode: Bytecode) -> List[Step]:
+    """
+    Parses the step instructions of a bytecode into a list of steps. Child traversals are parsed recursively
+    and modulators are attached to the step they modulate.
+
+    :param bytecode: (Bytecode)
+    :return: (List[Step])
+    """
+
+    steps = []
+
+    for instruction in bytecode.step_instructions:
+        name, arguments = instruction[0], [parse_argument(argument) for argument in instruction[1:]]
+
+        if name in MODULATORS:
+            if not steps:
+                raise LocalGraphException("The modulator {} must follow a step.".format(name))
+
+            steps[-1].modulators.append((name, arguments))
+        else:
+            steps.append(Step(name, arguments))
+
+    return steps
+
+
+def parse_argument(argument: Any) -> Any:
+
+    if isinstance(argument, Bytecode):
+        return parse(argument)
+
+    if isinstance(argument, list):
+        return [parse_argument(item) for item in argument]
+
+    return argument
+
+
+def is_traversal(argument: Any) -> bool:
+
+    return isinstance(argument, list) and all(isinstance(step, Step) for step in argument) and len(argument) > 0
+
+
+### Predicates
+
+
+def compare(operator: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+
+    def test(value: Any, other: Any) -> bool:
+        try:
+            return value is not None and operator(value, other)
+        except TypeError:
+            return False
+
+    return test
+
+
+def text(operator: Callable[[str, str], bool]) -> Callable[[Any, Any], bool]:
+
+    def test(value: Any, other: Any) -> bool:
+        return isinstance(value, str) and operator(value, other)
+
+    return test
+
+
+PREDICATES = {
+    "eq": lambda value, other: value == other,
+    "neq": lambda value, other: value != other,
+    "lt": compare(lambda value, other: value < other),
+    "lte": compare(lambda value, other: value <= other),
+    "gt": compare(lambda value, other: value > other),
+    "gte": compare(lambda value, other: value >= other),
+    "within": lambda value, other: value in other,
+    "without": lambda value, other: value not in other,
+    "containing": text(lambda value, other: other in value),
+    "notContaining": text(lambda value, other: other not in value),
+    "startingWith": text(lambda value, other: value.startswith(other)),
+    "notStartingWith": text(lambda value, other: not value.startswith(other)),
+    "endingWith": text(lambda value, other: value.endswith(other)),
+    "notEndingWith": text(lambda value, other: not value.endswith(other))
+}
+
+
+def test(predicate: Any, value: Any) -> bool:
+    """
+    Tests a value against a predicate. A predicate that is not a P is tested for equality.
+
+    :param predicate: (P|Any)
+    :param value: (Any)
+    :return: (bool)
+    """
+
+    if not isinstance(predicate, P):
+        return value == predicate
+
+    operator = predicate.operator
+
+    if operator == "and":
+        return test(predicate.value, value) and test(predicate.other, value)
+
+    if operator == "or":
+        return test(predicate.value, value) or test(predicate.other, value)
+
+    if operator == "not":
+        return not test(predicate.value, value)
+
+    if operator == "between":
+        return test(P("gte", predicate.value), value) and test(P("lt", predicate.other), value)
+
+    if operator == "inside":
+        return test(P("gt", predicate.value), value) and test(P("lt", predicate.other), value)
+
+    if operator == "outside":
+        return test(P("lt", predicate.value), value) or test(P("gt", predicate.other), value)
+
+    if operator not in PREDICATES:
+        raise LocalGraphException("The predicate {} is not supported.".format(operator))
+
+    return PREDICATES[operator](value, predicate.value)
+
+
+def equalities(predicate: Any) -> Optional[List[Any]]:
+    """
+    Returns the values a predicate is satisfied by, if the predicate is an equality (eq / within),
+    otherwise None. This is used to answer predicates using indexes.
+
+    :param predicate: (P|Any)
+    :return: (List|None)
+    """
+
+    if not isinstance(predicate, P):
+        return [predicate]
+
+    if predicate.operator == "eq":
+        return [predicate.value]
+
+    if predicate.operator == "within":
+        return list(predicate.value)
+
+    return None
+
+
+### Ordering
+
+
+class Descending:
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __lt__(self, other: "Descending") -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other: "Descending") -> bool:
+        return self.value == other.value
+
+
+def order_value(value: Any) -> Tuple:
+    """
+    Returns a sort key that places missing (None) values first and orders values of
+    different types by their type name.
+
+    :param value: (Any)
+    :return: (Tuple)
+    """
+
+    if value is None:
+        return 0, "", 0
+
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return 1, type(value).__name__, value
+
+    return 1, "", value
+
+
+def is_descending(order: Any) -> bool:
+
+    return isinstance(order, Order) and order.name in ("desc", "decr")
+
+
+### Graph
+
+
+class LocalGraph:
+
+    def __init__(self, indexed_properties: Optional[Iterable[str]] = None):
+        """
+        An in-memory property graph with a label index and property (equality) indexes.
+
+        :param indexed_properties: The property keys to index. If None, every property key is indexed. (Iterable|None)
+        """
+
+        self._indexed_properties = set(indexed_properties) if indexed_properties is not None else None
+
+        self._vertices = {}
+        self._edges = {}
+        self._properties = {}
+
+        self._out_edges = {}
+        self._in_edges = {}
+
+        self._label_index = {}
+        self._property_index = {}
+
+        self._ids = counter(1)
+
+    ### Mutations
+
+    def _new_id(self, elements: Dict) -> str:
+
+        identifier = str(next(self._ids))
+
+        while identifier in elements:
+            identifier = str(next(self._ids))
+
+        return identifier
+
+    def add_vertex(self, label: str, properties: Optional[Dict] = None, id: Optional[Any] = None) -> Vertex:
+        """
+
+        :param label: (str)
+        :param properties: (Dict|None)
+        :param id: The vertex id, generated if None. (Any)
+        :return: (Vertex)
+        """
+
+        identifier = id if id is not None else self._new_id(self._vertices)
+
+        if identifier in self._vertices:
+            raise LocalGraphException("A vertex with id {} already exists.".format(identifier))
+
+        vertex = Vertex(identifier, label)
+
+        self._vertices[identifier] = vertex
+        self._properties[vertex] = {}
+        self._out_edges[identifier] = {}
+        self._in_edges[identifier] = {}
+        self._label_index.setdefault(label, {})[identifier] = None
+
+        for key, value in (properties or {}).items():
+            self.set_property(vertex, key, value)
+
+        return vertex
+
+    def add_edge(
+            self,
+            label: str,
+            out_vertex: Any,
+            in_vertex: Any,
+            properties: Optional[Dict] = None,
+            id: Optional[Any] = None
+    ) -> Edge:
+        """
+
+        :param label: (str)
+        :param out_vertex: The out vertex (or its id). (Vertex|Any)
+        :param in_vertex: The in vertex (or its id). (Vertex|Any)
+        :param properties: (Dict|None)
+        :param id: The edge id, generated if None. (Any)
+        :return: (Edge)
+        """
+
+        out_vertex = self._vertices[out_vertex.id if isinstance(out_vertex, Vertex) else out_vertex]
+        in_vertex = self._vertices[in_vertex.id if isinstance(in_vertex, Vertex) else in_vertex]
+
+        identifier = id if id is not None else self._new_id(self._edges)
+
+        if identifier in self._edges:
+            raise LocalGraphException("An edge with id {} already exists.".format(identifier))
+
+        edge = Edge(identifier, out_vertex, label, in_vertex)
+
+        self._edges[identifier] = edge
+        self._properties[edge] = {}
+        self._out_edges[out_vertex.id].setdefault(label, []).append(edge)
+        self._in_edges[in_vertex.id].setdefault(label, []).append(edge)
+
+        for key, value in (properties or {}).items():
+            self.set_property(edge, key, value)
+
+        return edge
+
+    def set_property(self, element: Element, key: str, value: Any) -> None:
+        """
+        Sets a (single cardinality) property of an element, updating the property index of vertices.
+
+        :param element: (Element)
+        :param key: (str)
+        :param value: (Any)
+        :return:
+        """
+
+        properties = self._properties[element]
+
+        if isinstance(element, Vertex):
+            self._unindex(element, key)
+
+        properties[key] = value
+
+        if isinstance(element, Vertex) and self._is_indexed(key, value):
+            self._property_index.setdefault(key, {}).setdefault(value, {})[element.id] = None
+
+    def set_id(self, vertex: Vertex, id: Any) -> None:
+
+        if id in self._vertices:
+            raise LocalGraphException("A vertex with id {} already exists.".format(id))
+
+        properties, edges = self._properties[vertex], (self._out_edges.pop(vertex.id), self._in_edges.pop(vertex.id))
+
+        for key in properties:
+            self._unindex(vertex, key)
+
+        del self._vertices[vertex.id]
+        del self._label_index[vertex.label][vertex.id]
+        del self._properties[vertex]
+
+        vertex.id = id
+
+        self._vertices[id] = vertex
+        self._properties[vertex] = properties
+        self._out_edges[id], self._in_edges[id] = edges
+        self._label_index[vertex.label][id] = None
+
+        for key, value in properties.items():
+            if self._is_indexed(key, value):
+                self._property_index.setdefault(key, {}).setdefault(value, {})[id] = None
+
+    def remove(self, element: Element) -> None:
+
+        if isinstance(element, Edge):
+            if self._edges.pop(element.id, None) is None:
+                return
+
+            self._out_edges[element.outV.id][element.label].remove(element)
+            self._in_edges[element.inV.id][element.label].remove(element)
+            del self._properties[element]
+            return
+
+        if element.id not in self._vertices:
+            return
+
+        for edges in (self._out_edges[element.id], self._in_edges[element.id]):
+            for edge in [edge for label_edges in edges.values() for edge in label_edges]:
+                self.remove(edge)
+
+        for key in self._properties[element]:
+            self._unindex(element, key)
+
+        del self._vertices[element.id]
+        del self._label_index[element.label][element.id]
+        del self._properties[element]
+        del self._out_edges[element.id]
+        del self._in_edges[element.id]
+
+    def _is_indexed(self, key: str, value: Any) -> bool:
+
+        if self._indexed_properties is not None and key not in self._indexed_properties:
+            return False
+
+        try:
+            hash(value)
+        except TypeError:
+            return False
+
+        return True
+
+    def _unindex(self, vertex: Vertex, key: str) -> None:
+
+        properties = self._properties[vertex]
+
+        if key in properties and self._is_indexed(key, properties[key]):
+            self._property_index[key][properties[key]].pop(vertex.id, None)
+
+    ### Accessors
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self._vertices)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._edges)
+
+    def vertices(self, ids: Optional[Iterable[Any]] = None) -> Iterator[Vertex]:
+
+        if ids is None:
+            return iter(list(self._vertices.values()))
+
+        return (self._vertices[i] for i in ids if i in self._vertices)
+
+    def edges(self, ids: Optional[Iterable[Any]] = None) -> Iterator[Edge]:
+
+        if ids is None:
+            return iter(list(self._edges.values()))
+
+        return (self._edges[i] for i in ids if i in self._edges)
+
+    def properties(self, element: Element) -> Dict[str, Any]:
+
+        return self._properties.get(element, {})
+
+    def adjacent_edges(self, vertex: Vertex, direction: str, labels: Iterable[str]) -> Iterator[Edge]:
+
+        adjacency = [self._out_edges, self._in_edges] if direction == "both" else \
+            [self._out_edges if direction == "out" else self._in_edges]
+
+        for edges in adjacency:
+            edges = edges.get(vertex.id, {})
+
+            for label in (labels or list(edges.keys())):
+                yield from edges.get(label, ())
+
+    def lookup(self, steps: List[Step]) -> Optional[List[Any]]:
+        """
+        Uses the label and property indexes to compute the candidate vertex ids of the index-able filter
+        steps (hasLabel, hasId, has with eq / within predicates and filter(label().is(...))) at the head
+        of steps. Returns None if no index applies.
+
+        The steps are still applied to the candidates, so the candidates may be a superset of the result.
+        Candidates are returned in insertion order, so that repeated traversals are deterministic.
+
+        :param steps: (List[Step])
+        :return: (List|None)
+        """
+
+        lookups = []
+
+        for step in steps:
+            if step.name not in INDEXED_FILTERS:
+                break
+
+            ids = self._index_lookup(step)
+
+            if ids is not None:
+                lookups.append(ids)
+
+        if not lookups:
+            return None
+
+        lookups.sort(key=len)
+        smallest, others = lookups[0], lookups[1:]
+
+        return [i for i in smallest if all(i in ids for ids in others)]
+
+    def _index_lookup(self, step: Step) -> Optional[Dict[Any, None]]:
+
+        arguments = step.arguments
+
+        if step.name == "hasLabel" and not isinstance(arguments[0], P):
+            return self._label_lookup(arguments)
+
+        if step.name == "hasId":
+            return self._id_lookup(arguments)
+
+        if step.name == "filter" and is_traversal(arguments[0]) and len(arguments[0]) == 2 and \
+                arguments[0][0].name == "label" and arguments[0][1].name == "is":
+            values = equalities(arguments[0][1].arguments[0])
+            return self._label_lookup(values) if values is not None else None
+
+        if step.name == "has" and len(arguments) >= 2:
+            key, predicate = arguments[-2], arguments[-1]
+            values = equalities(predicate) if not is_traversal(predicate) else None
+
+            if values is None:
+                return None
+
+            if key == T.id:
+                ids = self._id_lookup(values)
+            elif key == T.label:
+                ids = self._label_lookup(values)
+            elif self._indexed_properties is None or key in self._indexed_properties:
+                ids = {}
+                index = self._property_index.get(key, {})
+
+                for value in values:
+                    try:
+                        ids.update(index.get(value, {}))
+                    except TypeError:
+                        return None
+            else:
+                return None
+
+            if len(arguments) == 3:
+                labelled = self._label_lookup([arguments[0]])
+                ids = {i: None for i in ids if i in labelled}
+
+            return ids
+
+        return None
+
+    def _label_lookup(self, labels: Iterable[str]) -> Dict[Any, None]:
+
+        labels = list(labels)
+
+        if len(labels) == 1:
+            return self._label_index.get(labels[0], {})
+
+        ids = {}
+
+        for label in labels:
+            ids.update(self._label_index.get(label, {}))
+
+        return ids
+
+    def _id_lookup(self, ids: List[Any]) -> Dict[Any, None]:
+
+        if len(ids) == 1 and isinstance(ids[0], P):
+            values = equalities(ids[0])
+            return self._id_lookup(values) if values is not None else dict.fromkeys(self._vertices)
+
+        return {i: None for i in ids if i in self._vertices}
+
+    ### Execution
+
+    def execute(self, bytecode: Bytecode) -> List[Any]:
+        """
+        Executes the step instructions of bytecode, returning the results.
+
+        :param bytecode: (Bytecode)
+        :return: (List)
+        """
+
+        return list(Executor(self).run(parse(bytecode), root=True))
+
+
+### Executor
+
+
+def element_value(graph: LocalGraph, element: Any, key: Any) -> Tuple[bool, Any]:
+    """
+    Returns whether an element has the key (a property key or T.id / T.label) and its value.
+
+    :param graph: (LocalGraph)
+    :param element: (Any)
+    :param key: (str|T)
+    :return: (bool, Any)
+    """
+
+    if key == T.id:
+        return True, element.id if isinstance(element, Element) else None
+
+    if key == T.label:
+        return True, element.label if isinstance(element, Element) else None
+
+    if isinstance(element, Element):
+        properties = graph.properties(element)
+        return key in properties, properties.get(key)
+
+    if isinstance(element, dict):
+        return key in element, element.get(key)
+
+    return False, None
+
+
+def hashable(value: Any) -> Any:
+
+    if isinstance(value, dict):
+        return tuple((hashable(k), hashable(v)) for k, v in value.items())
+
+    if isinstance(value, (list, set)):
+        return tuple(hashable(item) for item in value)
+
+    return value
+
+
+REDUCING_STEPS = {"count", "fold", "sum", "min", "max", "mean", "group", "groupCount"}
+
+MISSING = object()
+
+
+class Executor:
+
+    def __init__(self, graph: LocalGraph):
+        """
+        Executes parsed steps over the local graph. Traversers are plain objects
+        (elements, values, lists and maps) and are streamed lazily between steps.
+
+        :param graph: (LocalGraph)
+        """
+
+        self._graph = graph
+
+    def run(self, steps: List[Step], traversers: Iterable[Any] = (None,), root: bool = False) -> Iterator[Any]:
+        """
+
+        :param steps: (List[Step])
+        :param traversers: The incoming traversers. (Iterable)
+        :param root: Whether steps is the root traversal, whose first step starts the traversal. (bool)
+        :return: (Iterator)
+        """
+
+        traversers = iter(traversers)
+        metrics = [] if root and steps and steps[-1].name == "profile" else None
+
+        for index, step in enumerate(steps):
+            method = getattr(self, "step_" + step.name, None)
+
+            if method is None:
+                raise LocalGraphException("The step {} is not supported.".format(step.name))
+
+            if step.name == "profile":
+                traversers = self.step_profile(step, traversers, metrics or [])
+            elif step.name == "V":
+                traversers = self.step_V(step, traversers, steps[index + 1:])
+            elif step.name == "order" and index + 1 < len(steps) and steps[index + 1].name in ("range", "limit") \
+                    and not isinstance(steps[index + 1].arguments[0], Scope) and steps[index + 1].arguments[-1] != -1:
+                traversers = self.step_order(step, traversers, limit=steps[index + 1].arguments[-1])
+            elif root and index == 0 and step.name == "inject":
+                traversers = iter(step.arguments)
+            else:
+                traversers = method(step, traversers)
+
+            if metrics is not None and step.name != "profile":
+                metric = {"name": step.name, "count": 0, "time": 0.0}
+                metrics.append(metric)
+                traversers = measure(traversers, metric)
+
+        return traversers
+
+    def first(self, steps: Any, traverser: Any) -> Any:
+        """
+        Returns the first result of the child traversal steps applied to traverser, or MISSING.
+
+        :param steps: (List[Step])
+        :param traverser: (Any)
+        :return: (Any)
+        """
+
+        return next(self.run(steps, (traverser,)), MISSING)
+
+    def by(self, modulator: Optional[List[Any]], traverser: Any) -> Any:
+        """
+        Applies a by modulator (empty, a child traversal, a property key or T.id / T.label) to a traverser.
+        Returns MISSING if the modulator produces no value.
+
+        :param modulator: (List|None)
+        :param traverser: (Any)
+        :return: (Any)
+        """
+
+        if not modulator or isinstance(modulator[0], Order):
+            return traverser
+
+        key = modulator[0]
+
+        if is_traversal(key):
+            return self.first(key, traverser)
+
+        present, value = element_value(self._graph, traverser, key)
+
+        return value if present else MISSING
+
+    def modulators(self, step: Step, count: int) -> List[Optional[List[Any]]]:
+
+        modulators = [arguments for name, arguments in step.modulators if name == "by"]
+
+        if not modulators:
+            return [None] * count
+
+        return [modulators[index % len(modulators)] for index in range(count)]
+
+    ### Start steps
+
+    def step_V(self, step: Step, traversers: Iterator[Any], following: List[Step]) -> Iterator[Any]:
+
+        for _ in traversers:
+            if step.arguments:
+                ids = [argument.id if isinstance(argument, Element) else argument for argument in step.arguments]
+
+                if len(ids) == 1 and isinstance(ids[0], list):
+                    ids = ids[0]
+
+                yield from self._graph.vertices(ids)
+                continue
+
+            candidates = self._graph.lookup(following)
+
+            yield from self._graph.vertices(candidates)
+
+    def step_E(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        for _ in traversers:
+            yield from self._graph.edges(step.arguments or None)
+
+    def step_inject(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        yield from traversers
+        yield from step.arguments
+
+    def step_addV(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        label = step.arguments[0] if step.arguments else "vertex"
+
+        for _ in traversers:
+            yield self._graph.add_vertex(label)
+
+    def step_addE(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        label = step.arguments[0]
+
+        for traverser in traversers:
+            endpoints = {"from": traverser, "to": traverser}
+
+            for name, arguments in step.modulators:
+                endpoint = arguments[0]
+                endpoints[name] = self.first(endpoint, traverser) if is_traversal(endpoint) else endpoint
+
+            yield self._graph.add_edge(label, endpoints["from"], endpoints["to"])
+
+    def step_property(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        arguments = step.arguments[1:] if isinstance(step.arguments[0], Cardinality) else step.arguments
+        key, value = arguments[0], arguments[1]
+
+        for traverser in traversers:
+            current = self.first(value, traverser) if is_traversal(value) else value
+
+            if key == T.id:
+                self._graph.set_id(traverser, current)
+            else:
+                self._graph.set_property(traverser, key, current)
+
+            yield traverser
+
+    def step_drop(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        for traverser in list(traversers):
+            self._graph.remove(traverser)
+
+        return iter(())
+
+    ### Filter steps
+
+    def step_has(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        arguments = step.arguments
+
+        if len(arguments) == 3:
+            label, key, predicate = arguments
+        elif len(arguments) == 2:
+            label, (key, predicate) = None, arguments
+        else:
+            label, key, predicate = None, arguments[0], MISSING
+
+        for traverser in traversers:
+            if label is not None and getattr(traverser, "label", None) != label:
+                continue
+
+            present, value = element_value(self._graph, traverser, key)
+
+            if not present:
+                continue
+
+            if predicate is MISSING:
+                yield traverser
+            elif is_traversal(predicate):
+                if self.first(predicate, value) is not MISSING:
+                    yield traverser
+            elif test(predicate, value):
+                yield traverser
+
+    def step_hasLabel(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        predicate = step.arguments[0] if isinstance(step.arguments[0], P) else P.within(list(step.arguments))
+
+        return (traverser for traverser in traversers if test(predicate, getattr(traverser, "label", None)))
+
+    def step_hasId(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        predicate = step.arguments[0] if isinstance(step.arguments[0], P) else P.within(list(step.arguments))
+
+        return (traverser for traverser in traversers if test(predicate, getattr(traverser, "id", None)))
+
+    def step_hasNot(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        key = step.arguments[0]
+
+        return (traverser for traverser in traversers if not element_value(self._graph, traverser, key)[0])
+
+    def step_is(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        predicate = step.arguments[0]
+
+        return (traverser for traverser in traversers if test(predicate, traverser))
+
+    def step_where(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        if not is_traversal(step.arguments[0]):
+            raise LocalGraphException("Only the where(traversal) form of the where step is supported.")
+
+        return self.step_filter(step, traversers)
+
+    def step_filter(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        steps = step.arguments[0]
+
+        return (traverser for traverser in traversers if self.first(steps, traverser) is not MISSING)
+
+    def step_not(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        steps = step.arguments[0]
+
+        return (traverser for traverser in traversers if self.first(steps, traverser) is MISSING)
+
+    def step_and(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        return (
+            traverser for traverser in traversers
+            if all(self.first(steps, traverser) is not MISSING for steps in step.arguments)
+        )
+
+    def step_or(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        return (
+            traverser for traverser in traversers
+            if any(self.first(steps, traverser) is not MISSING for steps in step.arguments)
+        )
+
+    def step_dedup(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        modulator = self.modulators(step, 1)[0]
+        seen = set()
+
+        for traverser in traversers:
+            key = hashable(self.by(modulator, traverser))
+
+            if key not in seen:
+                seen.add(key)
+                yield traverser
+
+    def step_range(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        if isinstance(step.arguments[0], Scope):
+            low, high = step.arguments[1:]
+            return (
+                traverser[low:None if high == -1 else high] if isinstance(traverser, list) else traverser
+                for traverser in traversers
+            )
+
+        low, high = step.arguments
+
+        return islice(traversers, low, None if high == -1 else high)
+
+    def step_limit(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        return self.step_range(Step("range", step.arguments[:-1] + [0, step.arguments[-1]]), traversers)
+
+    def step_skip(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        return islice(traversers, step.arguments[-1], None)
+
+    ### Map steps
+
+    def step_out(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        for traverser in traversers:
+            for edge in self._graph.adjacent_edges(traverser, "out", step.arguments):
+                yield edge.inV
+
+    def step_in(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        for traverser in traversers:
+            for edge in self._graph.adjacent_edges(traverser, "in", step.arguments):
+                yield edge.outV
+
+    def step_both(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        for traverser in traversers:
+            for edge in self._graph.adjacent_edges(traverser, "both", step.arguments):
+                yield edge.inV if edge.outV == traverser else edge.outV
+
+    def step_outE(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        for traverser in traversers:
+            yield from self._graph.adjacent_edges(traverser, "out", step.arguments)
+
+    def step_inE(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        for traverser in traversers:
+            yield from self._graph.adjacent_edges(traverser, "in", step.arguments)
+
+    def step_bothE(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        for traverser in traversers:
+            yield from self._graph.adjacent_edges(traverser, "both", step.arguments)
+
+    def step_inV(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        return (traverser.inV for traverser in traversers)
+
+    def step_outV(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        return (traverser.outV for traverser in traversers)
+
+    def step_id(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        return (traverser.id for traverser in traversers)
+
+    def step_label(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        return (traverser.label for traverser in traversers)
+
+    def step_identity(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        return traversers
+
+    def step_constant(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        return (step.arguments[0] for _ in traversers)
+
+    def step_values(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        for traverser in traversers:
+            properties = self._graph.properties(traverser) if isinstance(traverser, Element) else traverser
+
+            for key in (step.arguments or list(properties.keys())):
+                if key in properties:
+                    yield properties[key]
+
+    def step_valueMap(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        arguments = step.arguments
+        tokens = bool(arguments) and isinstance(arguments[0], bool) and arguments[0]
+        keys = [argument for argument in arguments if not isinstance(argument, bool)]
+        modulator = self.modulators(step, 1)[0]
+
+        for traverser in traversers:
+            properties = self._graph.properties(traverser)
+            value_map = {}
+
+            if tokens:
+                value_map[T.id], value_map[T.label] = traverser.id, traverser.label
+
+            for key in (keys or list(properties.keys())):
+                if key in properties:
+                    value = self.by(modulator, [properties[key]])
+
+                    if value is not MISSING:
+                        value_map[key] = value
+
+            yield value_map
+
+    def step_elementMap(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        for traverser in traversers:
+            properties = self._graph.properties(traverser)
+            element_map = {T.id: traverser.id, T.label: traverser.label}
+
+            for key in (step.arguments or list(properties.keys())):
+                if key in properties:
+                    element_map[key] = properties[key]
+
+            yield element_map
+
+    def step_unfold(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        for traverser in traversers:
+            if isinstance(traverser, dict):
+                yield from ({key: value} for key, value in traverser.items())
+            elif isinstance(traverser, (list, set, tuple)):
+                yield from traverser
+            else:
+                yield traverser
+
+    def step_project(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        keys = step.arguments
+        modulators = self.modulators(step, len(keys))
+
+        for traverser in traversers:
+            projection = {}
+
+            for key, modulator in zip(keys, modulators):
+                value = self.by(modulator, traverser)
+
+                if value is not MISSING:
+                    projection[key] = value
+
+            yield projection
+
+    def step_select(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        keys = [argument for argument in step.arguments if isinstance(argument, str)]
+        modulators = self.modulators(step, len(keys))
+
+        for traverser in traversers:
+            if not isinstance(traverser, dict) or any(key not in traverser for key in keys):
+                continue
+
+            selection = {}
+
+            for key, modulator in zip(keys, modulators):
+                value = self.by(modulator, traverser[key])
+
+                if value is not MISSING:
+                    selection[key] = value
+
+            if len(keys) == 1:
+                if keys[0] in selection:
+                    yield selection[keys[0]]
+            else:
+                yield selection
+
+    def step_coalesce(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        for traverser in traversers:
+            for steps in step.arguments:
+                results = list(self.run(steps, (traverser,)))
+
+                if results:
+                    yield from results
+                    break
+
+    def step_union(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        for traverser in traversers:
+            for steps in step.arguments:
+                yield from self.run(steps, (traverser,))
+
+    def step_local(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        for traverser in traversers:
+            yield from self.run(step.arguments[0], (traverser,))
+
+    def step_optional(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        for traverser in traversers:
+            results = list(self.run(step.arguments[0], (traverser,)))
+            yield from results if results else (traverser,)
+
+    ### Reducing steps
+
+    def step_count(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        if step.arguments and step.arguments[0] == Scope.local:
+            yield from (len(traverser) for traverser in traversers)
+            return
+
+        yield sum(1 for _ in traversers)
+
+    def step_fold(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        yield list(traversers)
+
+    def step_sum(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        yield sum(traversers)
+
+    def step_min(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        values = list(traversers)
+
+        if values:
+            yield min(values)
+
+    def step_max(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        values = list(traversers)
+
+        if values:
+            yield max(values)
+
+    def step_mean(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        values = list(traversers)
+
+        if values:
+            yield sum(values) / len(values)
+
+    def step_group(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        key_modulator, value_modulator = (self.modulators(step, 2) + [None, None])[:2]
+        groups = {}
+
+        for traverser in traversers:
+            key = self.by(key_modulator, traverser)
+
+            if key is not MISSING:
+                groups.setdefault(key, []).append(traverser)
+
+        result = {}
+
+        for key, members in groups.items():
+            if value_modulator and is_traversal(value_modulator[0]):
+                steps = value_modulator[0]
+
+                if steps[-1].name not in REDUCING_STEPS:
+                    steps = steps + [Step("fold", [])]
+
+                value = next(self.run(steps, members), MISSING)
+            elif value_modulator:
+                value = [v for v in (self.by(value_modulator, member) for member in members) if v is not MISSING]
+            else:
+                value = members
+
+            if value is not MISSING:
+                result[key] = value
+
+        yield result
+
+    def step_groupCount(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        modulator = self.modulators(step, 1)[0]
+        counts = {}
+
+        for traverser in traversers:
+            key = self.by(modulator, traverser)
+
+            if key is not MISSING:
+                counts[key] = counts.get(key, 0) + 1
+
+        yield counts
+
+    def step_order(self, step: Step, traversers: Iterator[Any], limit: Optional[int] = None) -> Iterator[Any]:
+
+        modulators = [arguments for name, arguments in step.modulators if name == "by"] or [[]]
+
+        if any(modulator and modulator[-1] == Order.shuffle for modulator in modulators):
+            values = list(traversers)
+            random.shuffle(values)
+            return iter(values)
+
+        def sort_key(traverser: Any) -> Tuple:
+            key = []
+
+            for modulator in modulators:
+                value = self.by(modulator, traverser)
+                value = order_value(None if value is MISSING else value)
+                key.append(Descending(value) if modulator and is_descending(modulator[-1]) else value)
+
+            return tuple(key)
+
+        if limit is not None:
+            return iter(heapq.nsmallest(limit, traversers, key=sort_key))
+
+        return iter(sorted(traversers, key=sort_key))
+
+    def step_profile(self, step: Step, traversers: Iterator[Any], metrics: List[Dict[str, Any]]) -> Iterator[Any]:
+        """
+        Drains the profiled traversal and yields its step-level metrics, in the form of the
+        TraversalMetrics returned by the profile() step of a Gremlin server.
+
+        :param step: (Step)
+        :param traversers: (Iterator)
+        :param metrics: The metrics recorded for each step by measure. (List[Dict])
+        :return: (Iterator)
+        """
+
+        for _ in traversers:
+            pass
+
+        total = metrics[-1]["time"] * 1000 if metrics else 0.0
+        step_metrics, previous = [], 0.0
+
+        for index, metric in enumerate(metrics):
+            duration, previous = metric["time"] * 1000 - previous, metric["time"] * 1000
+
+            step_metrics.append({
+                "id": str(index),
+                "name": metric["name"],
+                "counts": {"traverserCount": metric["count"], "elementCount": metric["count"]},
+                "dur": duration,
+                "annotations": {"percentDur": 100 * duration / total if total else 0.0}
+            })
+
+        yield {"dur": total, "metrics": step_metrics}
+
+    def step_barrier(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        return iter(list(traversers))
+
+    def step_discard(self, step: Step, traversers: Iterator[Any]) -> Iterator[Any]:
+
+        for _ in traversers:
+            pass
+
+        return iter(())
+
+    step_none = step_discard
+
+
+def measure(traversers: Iterator[Any], metric: Dict[str, Any]) -> Iterator[Any]:
+    """
+    Counts the traversers produced by a step and accumulates the time spent producing them
+    (including the time spent in the preceding steps).
+
+    :param traversers: (Iterator)
+    :param metric: (Dict)
+    :return: (Iterator)
+    """
+
+    while True:
+        start = time.perf_counter()
+
+        try:
+            traverser = next(traversers)
+        except StopIteration:
+            metric["time"] += time.perf_counter() - start
+            return
+
+        metric["time"] += time.perf_counter() - start
+        metric["count"] += 1
+
+        yield traverser
+
+
+### Remote connection
+
+
+class LocalRemoteConnection(RemoteConnection):
+
+    def __init__(self, graph: LocalGraph, latency: float = 0):
+        """
+        A remote connection that executes submitted traversals over a LocalGraph,
+        allowing resolvers to be profiled and load tested without a Neptune cluster.
+
+            g = traversal().withRemote(LocalRemoteConnection(graph))
+
+        :param graph: (LocalGraph)
+        :param latency: The simulated round trip latency of each submitted traversal in seconds. (float)
+        """
+
+        super().__init__("local://", "g")
+
+        self._graph = graph
+        self._latency = latency
+        self._submitted = 0
+
+    @property
+    def graph(self) -> LocalGraph:
+        return self._graph
+
+    @property
+    def submitted(self) -> int:
+        """
+        The number of traversals submitted to the connection.
+
+        :return: (int)
+        """
+
+        return self._submitted
+
+    def submit(self, bytecode: Bytecode) -> RemoteTraversal:
+
+        self._submitted += 1
+
+        if self._latency:
+            time.sleep(self._latency)
+
+        results = self._graph.execute(bytecode)
+        traversers = iter([Traverser(result, 1) for result in results])
+
+        try:
+            return RemoteTraversal(traversers)
+        except TypeError:
+            # gremlinpython < 3.5 requires the side effects of the remote traversal.
+            return RemoteTraversal(traversers, TraversalSideEffects())
+
+    def is_closed(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,422 @@
+from typing import Dict, Any, Optional, List, Tuple
+from collections import deque
+from enum import Enum
+from logging import Logger
+from threading import Lock
+import bisect
+import hashlib
+import random
+import time
+
+from gremlin_python.driver.remote_connection import RemoteConnection, RemoteTraversal
+from gremlin_python.process.traversal import Bytecode, P
+
+
+### Fingerprints
+
+
+# Steps whose arguments are all literals (ids, injected values, bounds, projection keys, ...).
+LITERAL_STEPS = {
+    "V", "E", "inject", "is", "constant", "hasId", "range", "limit", "skip", "coin", "sample", "times", "project"
+}
+
+# Steps whose last argument is a literal value (e.g. has(key, value), property(key, value)).
+VALUE_STEPS = {"has", "property"}
+
+# Steps repeated once per key of the previous step (e.g. project(a, b, ...).by(...).by(...)).
+REPEATED_STEPS = {"by"}
+
+MUTATION_STEPS = {"addV", "addE", "property", "drop", "mergeV", "mergeE"}
+
+
+def collapse(normalized: List[str], item: str) -> List[str]:
+    """
+    Returns normalized without the consecutive repetitions of item, so that traversals only differing
+    by their number of literals (e.g. V(1, 2) and V(1, 2, 3)) share the same shape.
+
+    :param normalized: (List[str])
+    :param item: (str)
+    :return: (List[str])
+    """
+
+    return [
+        value for index, value in enumerate(normalized)
+        if value != item or index == 0 or normalized[index - 1] != item
+    ]
+
+
+def normalize_argument(argument: Any, literal: bool) -> str:
+    """
+    Returns the normalized form of a step argument. Child traversals are normalized recursively,
+    predicates keep their operator and literals (numbers and literal strings / lists) are replaced by ?.
+
+    :param argument: (Any)
+    :param literal: Whether the argument is in a literal position of its step. (bool)
+    :return: (str)
+    """
+
+    if isinstance(argument, Bytecode):
+        return normalize(argument)
+
+    if isinstance(argument, P):
+        if argument.operator in ("and", "or"):
+            return "{}({},{})".format(
+                argument.operator, normalize_argument(argument.value, True), normalize_argument(argument.other, True)
+            )
+
+        if argument.operator == "not":
+            return "not({})".format(normalize_argument(argument.value, True))
+
+        return "{}(?)".format(argument.operator)
+
+    if isinstance(argument, Enum):
+        return "{}.{}".format(type(argument).__name__, argument.name)
+
+    if isinstance(argument, bool):
+        return str(argument).lower()
+
+    if literal or isinstance(argument, (int, float, dict)):
+        return "?"
+
+    if isinstance(argument, (list, tuple, set)):
+        return "[{}]".format(",".join(collapse([normalize_argument(item, literal) for item in argument], "?")))
+
+    return str(argument)
+
+
+def normalize_label(argument: Any) -> str:
+    """
+    Returns the normalized form of a label argument. Labels are part of the shape of a traversal, so they
+    are kept (predicates included), e.g. within([Post, User]).
+
+    :param argument: (Any)
+    :return: (str)
+    """
+
+    if isinstance(argument, P):
+        if argument.operator in ("and", "or"):
+            return "{}({},{})".format(argument.operator, normalize_label(argument.value), normalize_label(argument.other))
+
+        return "{}({})".format(argument.operator, normalize_label(argument.value))
+
+    if isinstance(argument, (list, tuple, set)):
+        return "[{}]".format(",".join(sorted(normalize_label(item) for item in argument)))
+
+    return str(argument)
+
+
+def is_label_step(step_name: str, previous_step_name: Optional[str]) -> bool:
+    """
+    Returns whether the arguments of a step are labels, that is for hasLabel(...) and the is(...) of label().is(...)
+    (e.g. filter(label().is(User)) as emitted by vertex_filter).
+
+    :param step_name: (str)
+    :param previous_step_name: (str|None)
+    :return: (bool)
+    """
+
+    return step_name == "hasLabel" or (step_name == "is" and previous_step_name == "label")
+
+
+def normalize(bytecode: Bytecode) -> str:
+    """
+    Returns the normalized shape of a traversal, with literals stripped. For example
+
+        g.V("1", "2").out("FOLLOWS").has("age", lt(30)).range(0, 10)
+
+    has the shape
+
+        V(?).out(FOLLOWS).has(age,lt(?)).range(?)
+
+    Consecutive literals are collapsed into a single ? and consecutive identical by() modulators into
+    by(...)*, so that e.g. the fused traversals of batches of different sizes share the same shape.
+    Labels are kept (see is_label_step), so that the traversals of different vertex types have different shapes.
+
+    :param bytecode: (Bytecode)
+    :return: (str)
+    """
+
+    steps = []
+    previous_step_name = None
+
+    for instruction in bytecode.step_instructions:
+        step_name, arguments = instruction[0], instruction[1:]
+
+        if is_label_step(step_name, previous_step_name):
+            normalized = [normalize_label(argument) for argument in arguments]
+        else:
+            normalized = [
+                normalize_argument(
+                    argument,
+                    step_name in LITERAL_STEPS or (step_name in VALUE_STEPS and index == len(arguments) - 1)
+                )
+                for index, argument in enumerate(arguments)
+            ]
+
+        previous_step_name = step_name
+
+        step = "{}({})".format(step_name, ",".join(collapse(normalized, "?")))
+
+        if step_name in REPEATED_STEPS and steps and steps[-1] in (step, step + "*"):
+            steps[-1] = step + "*"
+        else:
+            steps.append(step)
+
+    return ".".join(steps)
+
+
+def fingerprint(bytecode: Bytecode) -> Tuple[str, str]:
+    """
+    Returns the fingerprint of a traversal, a short hash of its normalized shape. Traversals that only
+    differ by their literals share the same fingerprint.
+
+    :param bytecode: (Bytecode)
+    :return: The fingerprint and the normalized shape. (str, str)
+    """
+
+    shape = normalize(bytecode)
+
+    return hashlib.sha1(shape.encode("utf-8")).hexdigest()[:16], shape
+
+
+def is_mutation(bytecode: Bytecode) -> bool:
+
+    for instruction in bytecode.step_instructions:
+        if instruction[0] in MUTATION_STEPS:
+            return True
+
+        if any(isinstance(argument, Bytecode) and is_mutation(argument) for argument in instruction[1:]):
+            return True
+
+    return False
+
+
+### Histograms
+
+
+LATENCY_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+class LatencyHistogram:
+
+    def __init__(self, shape: str):
+        """
+        Latency histogram of the traversals sharing a fingerprint. Latencies are counted in the
+        buckets (in milliseconds) of LATENCY_BUCKETS, with a final overflow bucket.
+
+        :param shape: The normalized shape of the traversals. (str)
+        """
+
+        self.shape = shape
+        self.count = 0
+        self.slow_count = 0
+        self.error_count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, duration: float, slow: bool, error: bool = False) -> None:
+
+        self.count += 1
+        self.slow_count += int(slow)
+        self.error_count += int(error)
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+
+        labels = ["le_{}".format(bucket) for bucket in LATENCY_BUCKETS] + ["inf"]
+
+        return {
+            "shape": self.shape,
+            "count": self.count,
+            "slow_count": self.slow_count,
+            "error_count": self.error_count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "max_ms": self.max,
+            "buckets": dict(zip(labels, self.buckets))
+        }
+
+
+### Slow query log
+
+
+class SlowQueryLog:
+
+    def __init__(
+            self,
+            threshold: float,
+            logger: Optional[Logger] = None,
+            profile_sample_rate: float = 0,
+            max_fingerprints: int = 1000,
+            max_entries: int = 100
+    ):
+        """
+        Slow query log constructor. Every submitted traversal is timed and recorded in the latency histogram
+        of its fingerprint. Traversals slower than threshold are logged (and kept in entries) with their fingerprint
+        and normalized shape. A sample of the slow read traversals are re-run with the profile() step so that their
+        step-level metrics are captured.
+
+        :param threshold: The slow query threshold in milliseconds. (float)
+        :param logger: (Logger|None)
+        :param profile_sample_rate: The probability of profiling a slow read traversal. (float)
+        :param max_fingerprints: The maximum number of histograms kept. (int)
+        :param max_entries: The maximum number of slow queries kept. (int)
+        """
+
+        self._threshold = threshold
+        self._logger = logger
+        self._profile_sample_rate = profile_sample_rate
+        self._max_fingerprints = max_fingerprints
+
+        self._histograms = {}
+        self._entries = deque(maxlen=max_entries)
+        self._lock = Lock()
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    def wrap(self, remote_connection: RemoteConnection) -> RemoteConnection:
+        """
+        Returns a remote connection that records the traversals submitted to remote_connection.
+
+        :param remote_connection: (RemoteConnection)
+        :return: (RemoteConnection)
+        """
+
+        return SlowQueryRemoteConnection(remote_connection, self)
+
+    def record(
+            self,
+            bytecode: Bytecode,
+            duration: float,
+            remote_connection: RemoteConnection,
+            error: Optional[BaseException] = None
+    ) -> None:
+        """
+        Records a traversal, failed traversals (e.g. timeouts) included.
+
+        :param bytecode: The submitted bytecode. (Bytecode)
+        :param duration: The duration of the traversal in milliseconds. (float)
+        :param remote_connection: The connection the traversal was submitted to, used for profiling. (RemoteConnection)
+        :param error: The exception raised by the traversal, if it failed. (BaseException|None)
+        :return:
+        """
+
+        key, shape = fingerprint(bytecode)
+        slow = duration >= self._threshold
+
+        with self._lock:
+            histogram = self._histograms.get(key)
+
+            if histogram is None and len(self._histograms) < self._max_fingerprints:
+                histogram = self._histograms[key] = LatencyHistogram(shape)
+
+            if histogram is not None:
+                histogram.record(duration, slow, error is not None)
+
+        if not slow:
+            return
+
+        profile = None
+
+        if error is None and self._profile_sample_rate and random.random() < self._profile_sample_rate and not is_mutation(bytecode):
+            profile = self._profile(bytecode, remote_connection)
+
+        entry = {
+            "fingerprint": key,
+            "shape": shape,
+            "duration_ms": duration,
+            "error": None if error is None else "{}: {}".format(type(error).__name__, error),
+            "profile": profile
+        }
+
+        with self._lock:
+            self._entries.append(entry)
+
+        if self._logger:
+            self._logger.warning(
+                "Slow traversal %s %s after %.1f ms: %s", key, "completed" if error is None else "failed", duration, shape
+            )
+
+            if profile is not None:
+                self._logger.warning("Profile of slow traversal %s: %s", key, profile)
+
+    def _profile(self, bytecode: Bytecode, remote_connection: RemoteConnection) -> Any:
+
+        profiled = Bytecode(bytecode)
+        profiled.add_step("profile")
+
+        try:
+            return next(remote_connection.submit(profiled).traversers).object
+        except Exception:
+            if self._logger:
+                self._logger.warning("Unable to profile the slow traversal.", exc_info=True)
+
+            return None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the latency histograms keyed by fingerprint.
+
+        :return: (Dict)
+        """
+
+        with self._lock:
+            return {key: histogram.to_dict() for key, histogram in self._histograms.items()}
+
+    @property
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        The most recent slow queries.
+
+        :return: (List[Dict])
+        """
+
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self) -> None:
+
+        with self._lock:
+            self._histograms.clear()
+            self._entries.clear()
+
+
+class SlowQueryRemoteConnection(RemoteConnection):
+
+    def __init__(self, remote_connection: RemoteConnection, slow_query_log: SlowQueryLog):
+        """
+        A remote connection that times the traversals submitted to remote_connection
+        and records them in the slow query log.
+
+        :param remote_connection: (RemoteConnection)
+        :param slow_query_log: (SlowQueryLog)
+        """
+
+        super().__init__(remote_connection.url, remote_connection.traversal_source)
+
+        self._remote_connection = remote_connection
+        self._slow_query_log = slow_query_log
+
+    def submit(self, bytecode: Bytecode) -> RemoteTraversal:
+
+        start = time.perf_counter()
+        error = None
+
+        try:
+            return self._remote_connection.submit(bytecode)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self._slow_query_log.record(bytecode, duration, self._remote_connection, error)
+
+    def is_closed(self) -> bool:
+        return self._remote_connection.is_closed()
+
+    def close(self) -> None:
+        self._remote_connection.close()
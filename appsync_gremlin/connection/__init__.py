@@ -0,0 +1,6 @@
+from appsync_gremlin.connection.LocalGraph import LocalGraph, LocalRemoteConnection, LocalGraphException
+from appsync_gremlin.connection.SlowQueryLog import SlowQueryLog, LatencyHistogram, fingerprint
+from appsync_gremlin.connection.Limiter import (
+    ConcurrencyLimiter, CircuitBreaker, CircuitState, GuardedRemoteConnection
+)
+from appsync_gremlin.connection.Driver import ReconnectingRemoteConnection
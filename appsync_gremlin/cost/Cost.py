@@ -0,0 +1,220 @@
+from typing import Dict, List, Any, Optional
+
+from appsync_gremlin.helpers.Exceptions import AppSyncException
+
+
+###
+
+
+# The predicate names of the scalar filter inputs (see appsync_gremlin.filter).
+PREDICATE_NAMES = {
+    "eq", "ne", "neq", "in", "not_in", "le", "lt", "ge", "gt",
+    "contains", "not_contains", "begins_with", "not_begins_with", "ends_with", "not_ends_with"
+}
+
+
+def is_scalar_filter_input(filter_input: Any) -> bool:
+    """
+    A filter input is a scalar filter input if it maps predicate names to values, otherwise
+    it is the vertex filter input of a relationship filter. An empty filter input is counted as
+    a relationship filter input, since e.g. {"following": {}} still emits a where(out(...)) sub-traversal.
+
+    :param filter_input: (Any)
+    :return: (bool)
+    """
+
+    if not isinstance(filter_input, dict):
+        return True
+
+    return bool(filter_input) and all(key in PREDICATE_NAMES for key in filter_input)
+
+
+class QueryCost:
+
+    def __init__(self):
+        """
+        The estimated cost of a vertex list query, computed from its filter input and
+        pagination (see estimate_cost).
+        """
+
+        self.depth = 0
+        self.relationships = 0
+        self.fan_out = 0
+        self.max_list_size = 0
+        self.list_items = 0
+        self.per_page = 0
+        self.last = 0
+        self.sorts = 0
+        self.facets = 0
+        self.score = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+
+        return {
+            "depth": self.depth,
+            "relationships": self.relationships,
+            "fan_out": self.fan_out,
+            "max_list_size": self.max_list_size,
+            "list_items": self.list_items,
+            "per_page": self.per_page,
+            "last": self.last,
+            "sorts": self.sorts,
+            "facets": self.facets,
+            "score": self.score
+        }
+
+
+def walk_filter_input(cost: QueryCost, input_dict: Dict, depth: int, fan_out_factor: int) -> None:
+
+    for filter_input in input_dict.values():
+        if is_scalar_filter_input(filter_input):
+            for value in (filter_input.values() if isinstance(filter_input, dict) else ()):
+                if isinstance(value, list):
+                    cost.max_list_size = max(cost.max_list_size, len(value))
+                    cost.list_items += len(value)
+
+            continue
+
+        cost.relationships += 1
+        cost.fan_out += fan_out_factor ** depth
+        cost.depth = max(cost.depth, depth + 1)
+
+        walk_filter_input(cost, filter_input, depth + 1, fan_out_factor)
+
+
+def estimate_cost(
+        input_dict: Dict,
+        pagination: Dict,
+        sort_inputs: Optional[List[Dict]] = None,
+        facet_inputs: Optional[List[Dict]] = None,
+        fan_out_factor: int = 10
+) -> QueryCost:
+    """
+    Estimates the cost of a vertex list query before its traversal is built. The filter input is walked
+    to find the relationship filters (the nested vertex filter inputs), their depth and the sizes of the
+    list predicates (in / not_in).
+
+    A relationship filter at depth d (starting from 0) is a where() sub-traversal that is evaluated for every
+    traverser of its parent, so its fan-out is estimated as fan_out_factor ** d.
+
+    :param input_dict: The vertex filter input. (Dict)
+    :param pagination: The pagination input. (Dict)
+    :param sort_inputs: (List[Dict]|None)
+    :param facet_inputs: (List[Dict]|None)
+    :param fan_out_factor: The estimated number of adjacent vertices per relationship. (int)
+    :return: (QueryCost)
+    """
+
+    cost = QueryCost()
+
+    walk_filter_input(cost, input_dict or {}, 0, fan_out_factor)
+
+    cost.per_page = pagination.get("per_page") or 0
+    cost.last = (pagination.get("page") or 1) * cost.per_page
+    cost.sorts = len(sort_inputs or [])
+    cost.facets = len(facet_inputs or [])
+
+    return cost
+
+
+class CostBudget:
+
+    def __init__(
+            self,
+            max_score: Optional[int] = None,
+            max_depth: Optional[int] = None,
+            max_list_size: Optional[int] = None,
+            max_per_page: Optional[int] = None,
+            clamp_per_page: bool = False,
+            fan_out_factor: int = 10,
+            relationship_cost: int = 10,
+            list_item_cost: int = 1,
+            page_item_cost: int = 1,
+            sort_cost: int = 100,
+            facet_cost: int = 100
+    ):
+        """
+        Cost budget constructor. A budget rejects (or clamps) the vertex list queries whose estimated cost
+        exceeds its limits (None is unlimited). The score of a query is
+
+            relationship_cost * fan_out + list_item_cost * list_items + page_item_cost * last
+                + sort_cost * sorts + facet_cost * facets
+
+        where last is the index of the last vertex of the requested page (see estimate_cost).
+
+        :param max_score: (int|None)
+        :param max_depth: The maximum depth of nested relationship filters. (int|None)
+        :param max_list_size: The maximum size of a list predicate (in / not_in). (int|None)
+        :param max_per_page: (int|None)
+        :param clamp_per_page: If True, a per_page above max_per_page is clamped rather than rejected. (bool)
+        """
+
+        self._max_score = max_score
+        self._max_depth = max_depth
+        self._max_list_size = max_list_size
+        self._max_per_page = max_per_page
+        self._clamp_per_page = clamp_per_page
+
+        self._fan_out_factor = fan_out_factor
+        self._relationship_cost = relationship_cost
+        self._list_item_cost = list_item_cost
+        self._page_item_cost = page_item_cost
+        self._sort_cost = sort_cost
+        self._facet_cost = facet_cost
+
+    def estimate(
+            self,
+            input_dict: Dict,
+            pagination: Dict,
+            sort_inputs: Optional[List[Dict]] = None,
+            facet_inputs: Optional[List[Dict]] = None
+    ) -> QueryCost:
+
+        cost = estimate_cost(input_dict, pagination, sort_inputs, facet_inputs, self._fan_out_factor)
+
+        cost.score = self._relationship_cost * cost.fan_out + self._list_item_cost * cost.list_items + \
+            self._page_item_cost * cost.last + self._sort_cost * cost.sorts + self._facet_cost * cost.facets
+
+        return cost
+
+    def admit(
+            self,
+            input_dict: Dict,
+            pagination: Dict,
+            sort_inputs: Optional[List[Dict]] = None,
+            facet_inputs: Optional[List[Dict]] = None
+    ) -> Dict:
+        """
+        Checks a vertex list query against the budget, raising an AppSyncException with error type
+        QUERY_TOO_EXPENSIVE if it is rejected.
+
+        :param input_dict: (Dict)
+        :param pagination: (Dict)
+        :param sort_inputs: (List[Dict]|None)
+        :param facet_inputs: (List[Dict]|None)
+        :return: The (possibly clamped) pagination. (Dict)
+        """
+
+        per_page = pagination.get("per_page") or 0
+
+        if self._max_per_page is not None and per_page > self._max_per_page and self._clamp_per_page:
+            pagination = dict(pagination, per_page=self._max_per_page)
+
+        cost = self.estimate(input_dict, pagination, sort_inputs, facet_inputs)
+
+        limits = [
+            ("per_page", cost.per_page, self._max_per_page),
+            ("depth", cost.depth, self._max_depth),
+            ("max_list_size", cost.max_list_size, self._max_list_size),
+            ("score", cost.score, self._max_score)
+        ]
+
+        for limit_name, value, limit in limits:
+            if limit is not None and value > limit:
+                raise AppSyncException(
+                    error_type="QUERY_TOO_EXPENSIVE",
+                    error_message="The query exceeds the {} limit of {} (got {}).".format(limit_name, limit, value),
+                    error_data=cost.to_dict()
+                )
+
+        return pagination
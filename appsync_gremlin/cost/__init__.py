@@ -0,0 +1 @@
+from appsync_gremlin.cost.Cost import CostBudget, QueryCost, estimate_cost
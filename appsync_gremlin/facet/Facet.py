@@ -0,0 +1,275 @@
+from typing import Dict, List, Any, Callable, Optional
+from datetime import datetime
+import functools
+
+from gremlin_python.process.graph_traversal import GraphTraversal, __
+from gremlin_python.process.traversal import T, P
+
+from appsync_gremlin.helpers.Exceptions import AppSyncException
+
+
+### Types
+
+
+TraversalFacetFunction = Callable[[GraphTraversal, List[Dict]], GraphTraversal]
+FacetFieldsFunction = Callable[[], Dict[str, Any]]
+
+
+### Helpers
+
+
+def bad_boundaries(field_name: str, buckets: List[Any], reason: str) -> AppSyncException:
+
+    return AppSyncException(
+        error_type="BAD_REQUEST",
+        error_message="Invalid buckets for {}: {}".format(field_name, reason),
+        error_data={
+            "field": field_name,
+            "buckets": buckets
+        }
+    )
+
+
+def parse_boundary(boundary: Any) -> Any:
+    """
+    Parses a bucket boundary, a FacetBoundaryInput of the form {"number": ...} or {"date_time": ...}.
+    Bare numbers and DateTimeInput dictionaries (see the DateTime filtering standard) are accepted too.
+    Date times are converted to datetimes.
+
+    :param boundary: (Any)
+    :return: (Any)
+    """
+
+    if isinstance(boundary, dict) and "number" in boundary:
+        return boundary.get("number")
+
+    if isinstance(boundary, dict) and "date_time" in boundary:
+        boundary = boundary.get("date_time")
+
+    if not isinstance(boundary, dict):
+        return boundary
+
+    if boundary.get("formatted"):
+        return datetime.fromisoformat(boundary.get("formatted").replace("Z", "+00:00"))
+
+    return datetime(
+        boundary.get("year"),
+        boundary.get("month") or 1,
+        boundary.get("day") or 1,
+        boundary.get("hour") or 0,
+        boundary.get("minute") or 0,
+        boundary.get("second") or 0
+    )
+
+
+def parse_boundaries(field_name: str, buckets: List[Any]) -> List[Any]:
+    """
+    Parses the bucket boundaries of a facet input, which must all be numbers or all be date times,
+    in strictly ascending order. Otherwise an AppSyncException (BAD_REQUEST) is raised.
+
+    :param field_name: (str)
+    :param buckets: (List)
+    :return: (List)
+    """
+
+    try:
+        boundaries = [parse_boundary(boundary) for boundary in buckets]
+    except (ValueError, TypeError, AttributeError) as e:
+        raise bad_boundaries(field_name, buckets, "unable to parse a boundary ({}).".format(e))
+
+    is_number = [isinstance(boundary, (int, float)) and not isinstance(boundary, bool) for boundary in boundaries]
+    is_date_time = [isinstance(boundary, datetime) for boundary in boundaries]
+
+    if not (all(is_number) or all(is_date_time)):
+        raise bad_boundaries(field_name, buckets, "the boundaries must all be numbers or all be date times.")
+
+    try:
+        ascending = all(lower < upper for lower, upper in zip(boundaries, boundaries[1:]))
+    except TypeError:
+        # e.g. comparing naive and offset-aware date times.
+        ascending = False
+
+    if not ascending:
+        raise bad_boundaries(field_name, buckets, "the boundaries must be in strictly ascending order.")
+
+    return boundaries
+
+
+def format_boundary(boundary: Any, format: Callable[[Any], Any]) -> Optional[Dict]:
+    """
+    Formats a parsed bucket boundary into a FacetBoundary of the form {"number": ...} or {"date_time": ...}.
+
+    :param boundary: (Any)
+    :param format: The function formatting values. (Callable)
+    :return: (Dict|None)
+    """
+
+    if boundary is None:
+        return None
+
+    if isinstance(boundary, datetime):
+        return {"date_time": format(boundary)}
+
+    return {"number": boundary}
+
+
+def facet_values(key: Any) -> GraphTraversal:
+    """
+    Returns the anonymous traversal from the folded vertices to the values of key.
+
+    :param key: A property key, T.id or T.label. (Any)
+    :return: (GraphTraversal)
+    """
+
+    if key == T.label:
+        return __.unfold().label()
+
+    if key == T.id:
+        return __.unfold().id()
+
+    return __.unfold().values(key)
+
+
+def bucket_predicates(boundaries: List[Any]) -> List[P]:
+    """
+    Returns the predicates of the buckets delimited by boundaries b_1 < b_2 < ... < b_n, that is
+
+        lt(b_1), between(b_1, b_2), ..., between(b_n-1, b_n), gte(b_n)
+
+    The boundaries are validated by parse_boundaries.
+
+    :param boundaries: (List)
+    :return: (List[P])
+    """
+
+    predicates = [P.lt(boundaries[0])]
+
+    for lower, upper in zip(boundaries, boundaries[1:]):
+        predicates.append(P.between(lower, upper))
+
+    predicates.append(P.gte(boundaries[-1]))
+
+    return predicates
+
+
+### Facets
+
+
+def vertex_facets(fields_func: FacetFieldsFunction) -> TraversalFacetFunction:
+    """
+    Vertex facets decorator. This decorator decorates a function that returns a dictionary
+    that maps the GraphQL fields that can be faceted to Gremlin property keys (or T.id / T.label).
+
+    Using this dictionary we construct a facet_func that computes the requested facets of the folded list of
+    filtered vertices. For facet inputs [f_1, f_2, ..., f_n] the facet traversal has the general form:
+
+        g' = g.project("0", "1", ..., "n-1").by(c_1).by(c_2). ... .by(c_n)
+
+    where c_i is either
+
+        unfold().values(k_i).groupCount()
+
+    for a group-by facet, or
+
+        project("0", ..., "m").by(unfold().values(k_i).is(p_0).count()). ... .by(unfold().values(k_i).is(p_m).count())
+
+    for a bucket facet with bucket predicates p_0, ..., p_m (see bucket_predicates).
+
+        @vertex_facets
+        def user_facets():
+            return {
+                "status": "status",
+                "age": "age",
+                "created_at": "created_at"
+            }
+
+    :param fields_func: The function that returns the dictionary that maps GraphQL
+                        field names to property keys. (FacetFieldsFunction)
+    :return: (TraversalFacetFunction)
+    """
+
+    @functools.wraps(fields_func)
+    def facet_func(traversal: GraphTraversal, facet_inputs: List[Dict]) -> GraphTraversal:
+        """
+        This is the facet_func for vertex facets.
+
+        :param traversal: The traversal whose traverser is the folded list of filtered vertices. (GraphTraversal)
+        :param facet_inputs: A list of facet inputs of the form {"field": ..., "buckets": [...]}, where buckets are
+                             FacetBoundaryInputs (see parse_boundary). (List[Dict])
+        :return: (GraphTraversal)
+        """
+
+        fields = fields_func()
+
+        traversal = traversal.project(*[str(index) for index in range(len(facet_inputs))])
+
+        for facet_input in facet_inputs:
+            field_name = facet_input.get("field")
+
+            if field_name not in fields:
+                raise AppSyncException(
+                    error_type="BAD_REQUEST",
+                    error_message="Unable to facet by {}.".format(field_name),
+                    error_data={
+                        "field": field_name
+                    }
+                )
+
+            key = fields.get(field_name)
+            boundaries = parse_boundaries(field_name, facet_input.get("buckets") or [])
+
+            if not boundaries:
+                traversal = traversal.by(facet_values(key).groupCount())
+                continue
+
+            buckets = __.project(*[str(index) for index in range(len(boundaries) + 1)])
+
+            for predicate in bucket_predicates(boundaries):
+                buckets = buckets.by(facet_values(key).is_(predicate).count())
+
+            traversal = traversal.by(buckets)
+
+        return traversal
+
+    return facet_func
+
+
+def format_facets(facet_inputs: List[Dict], facets: Dict[str, Dict], format: Callable[[Any], Any]) -> List[Dict]:
+    """
+    Formats the result of a facet traversal into a list of facet results (in the order of facet_inputs) of the form
+
+        {"field": ..., "values": [{"value": ..., "count": ...}, ...]}
+
+    for group-by facets (ordered by descending count), and
+
+        {"field": ..., "values": [{"from": ..., "to": ..., "count": ...}, ...]}
+
+    for bucket facets, where from and to are FacetBoundaries (see format_boundary).
+
+    :param facet_inputs: (List[Dict])
+    :param facets: (Dict)
+    :param format: The function formatting values. (Callable)
+    :return: (List[Dict])
+    """
+
+    response = []
+
+    for index, facet_input in enumerate(facet_inputs):
+        facet = facets.get(str(index), {})
+        boundaries = parse_boundaries(facet_input.get("field"), facet_input.get("buckets") or [])
+
+        if not boundaries:
+            values = [
+                {"value": format(value), "count": count}
+                for value, count in sorted(facet.items(), key=lambda item: -item[1])
+            ]
+        else:
+            limits = [None] + [format_boundary(boundary, format) for boundary in boundaries] + [None]
+            values = [
+                {"from": limits[bucket], "to": limits[bucket + 1], "count": facet.get(str(bucket), 0)}
+                for bucket in range(len(boundaries) + 1)
+            ]
+
+        response.append({"field": facet_input.get("field"), "values": values})
+
+    return response
@@ -0,0 +1 @@
+from appsync_gremlin.facet.Facet import vertex_facets, format_facets, TraversalFacetFunction, FacetFieldsFunction
@@ -1,4 +1,4 @@
-from typing import Dict, Tuple, Callable
+from typing import Dict, Tuple, Callable, List, Optional, Set
 from enum import Enum
 import functools
 
@@ -84,6 +84,8 @@ def scalar_filter(filters_func: FilterFunction) -> NameFunction:
     :return: The name function that requires a field_name and will return the filter_func. (NameFunction)
     """
 
+    filters_func_ = functools.lru_cache(maxsize=None)(filters_func)
+
     @functools.wraps(filters_func)
     def name_func(field_name: str) -> TraversalFilterFunction:
         """
@@ -110,7 +112,7 @@ def scalar_filter(filters_func: FilterFunction) -> NameFunction:
             :return: (GraphTraversal)
             """
 
-            filters = filters_func()
+            filters = filters_func_()
 
             for predicate_name, value in input_dict.items():
                 predicate = filters.get(predicate_name)
@@ -118,6 +120,12 @@ def scalar_filter(filters_func: FilterFunction) -> NameFunction:
 
             return traversal
 
+        def dependencies() -> List[TraversalFilterFunction]:
+            filters_func_()
+            return []
+
+        filter_func.dependencies = dependencies
+
         return filter_func
 
     return name_func
@@ -158,6 +166,8 @@ def vertex_filter(filters_func: FilterFunction) -> NameFunction:
     :return: The name function that requires a field_name and will return the filter_func. (NameFunction)
     """
 
+    filters_func_ = functools.lru_cache(maxsize=None)(filters_func)
+
     @functools.wraps(filters_func)
     def name_func(vertex_name: str) -> TraversalFilterFunction:
         """
@@ -188,7 +198,7 @@ def vertex_filter(filters_func: FilterFunction) -> NameFunction:
             :return: (GraphTraversal)
             """
 
-            filters = filters_func()
+            filters = filters_func_()
 
             traversal = traversal.filter(label().is_(vertex_name))
 
@@ -197,6 +207,8 @@ def vertex_filter(filters_func: FilterFunction) -> NameFunction:
 
             return traversal
 
+        filter_func.dependencies = lambda: list(filters_func_().values())
+
         return filter_func
 
     return name_func
@@ -235,6 +247,8 @@ def relationship_filter(relationship: Relationship, vertex_filter_func: Traversa
 
         return traversal.where(traversal_)
 
+    filter_func.dependencies = lambda: [vertex_filter_func]
+
     return filter_func
 
 
@@ -265,6 +279,8 @@ def edge_filter(edge_direction: EdgeDirection, vertex_filter_func: TraversalFilt
 
         return traversal.where(traversal_)
 
+    filter_func.dependencies = lambda: [vertex_filter_func]
+
     return filter_func
 
 
@@ -289,13 +305,46 @@ def name(name: str) -> Callable[[NameFunction], TraversalFilterFunction]:
 
     def decorator(name_func: NameFunction) -> TraversalFilterFunction:
 
+        filter_func = functools.lru_cache(maxsize=None)(lambda: name_func(name))
+
         @functools.wraps(name_func)
         def wrapper(traversal: GraphTraversal, input_dict: Dict) -> GraphTraversal:
 
-            return name_func(name)(traversal, input_dict)
+            return filter_func()(traversal, input_dict)
+
+        wrapper.dependencies = lambda: [filter_func()]
 
         return wrapper
 
     return decorator
 
 
+def compile_filter(filter_func: TraversalFilterFunction, compiled: Optional[Set[int]] = None) -> int:
+    """
+    Builds the filter tree of filter_func ahead of its first use, that is the filters dictionaries
+    of its vertex / scalar filters and, recursively, those of the filters they depend on.
+
+    :param filter_func: (TraversalFilterFunction)
+    :param compiled: The ids of the filters already compiled, shared between calls. (Set[int]|None)
+    :return: The number of filters compiled. (int)
+    """
+
+    compiled = compiled if compiled is not None else set()
+    filter_funcs = [filter_func]
+    count = 0
+
+    while filter_funcs:
+        filter_func = filter_funcs.pop()
+
+        if id(filter_func) in compiled:
+            continue
+
+        compiled.add(id(filter_func))
+        count += 1
+
+        dependencies = getattr(filter_func, "dependencies", None)
+
+        if dependencies is not None:
+            filter_funcs.extend(dependencies())
+
+    return count
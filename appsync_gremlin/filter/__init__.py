@@ -7,7 +7,8 @@ from appsync_gremlin.filter.Filter import (
     RelationshipDirection, scalar_filter, vertex_filter, relationship_filter,
     TraversalFilterFunction, Relationship, FilterFunction, NameFunction,
     name,
-    EdgeDirection, edge_filter
+    EdgeDirection, edge_filter,
+    compile_filter
 )
 
 
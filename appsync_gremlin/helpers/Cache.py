@@ -0,0 +1,93 @@
+from typing import Any, Hashable
+from collections import OrderedDict
+from threading import Lock
+import json
+import time
+
+
+def cache_key(*values: Any) -> str:
+    """
+    Returns a deterministic key for JSON-like values (such as resolver arguments, sources
+    and identities). Dictionary keys are sorted and non JSON values are converted to strings.
+
+    :param values: (Any)
+    :return: (str)
+    """
+
+    return json.dumps(values, sort_keys=True, default=str)
+
+
+class TTLCache:
+
+    def __init__(self, ttl: float, max_size: int = 1024):
+        """
+        Time-to-live cache constructor. Entries are served for at most ttl seconds after
+        being set, bounding the staleness of cached values. Once max_size entries are stored,
+        the least recently set entry is evicted.
+
+        :param ttl: The time-to-live of an entry in seconds. A ttl <= 0 disables the cache. (float)
+        :param max_size: The maximum number of entries. (int)
+        """
+
+        self._ttl = ttl
+        self._max_size = max_size
+
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the value stored at key, or default if there is no such entry or the entry has expired.
+
+        :param key: (Hashable)
+        :param default: (Any)
+        :return: (Any)
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return default
+
+            expires_at, value = entry
+
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+
+        :param key: (Hashable)
+        :param value: (Any)
+        :return:
+        """
+
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self._ttl, value)
+
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,4 +1,5 @@
 from typing import Any, Dict
+import concurrent.futures
 
 
 class AppSyncException(Exception):
@@ -28,3 +29,63 @@ class AppSyncException(Exception):
             "data": self.error_data
         }
 
+
+# Transport exceptions raised by the websocket clients of gremlinpython, matched by name so that
+# the clients (tornado, aiohttp) need not be installed.
+CONNECTION_ERROR_NAMES = {
+    "WebSocketClosedError", "StreamClosedError", "ClientConnectionError", "ServerDisconnectedError",
+    "WSServerHandshakeError"
+}
+
+DISCONNECTED_MESSAGE = "Server disconnected"
+
+
+def is_connection_error(exception: BaseException) -> bool:
+    """
+    Returns whether exception was raised by the transport of a remote connection (a closed, reset or timed out
+    socket / websocket) as opposed to an error returned by the server for a traversal.
+
+    :param exception: (BaseException)
+    :return: (bool)
+    """
+
+    if isinstance(exception, (OSError, concurrent.futures.TimeoutError)):
+        return True
+
+    # gremlinpython reports a websocket closed by the server (e.g. an idle connection of a frozen container)
+    # as a GremlinServerError with status code 500.
+    if getattr(exception, "status_code", None) == 500 and DISCONNECTED_MESSAGE in str(exception):
+        return True
+
+    return any(cls.__name__ in CONNECTION_ERROR_NAMES for cls in type(exception).__mro__)
+
+
+# Errors returned by the server when it is overloaded or times out, matched in the server error message
+# (Neptune returns them as e.g. "500: {"code": "TimeLimitExceededException", ...}").
+UNAVAILABLE_ERROR_CODES = {
+    "TimeLimitExceededException", "ThrottlingException", "MemoryLimitExceededException",
+    "TooManyRequestsException", "InternalFailureException"
+}
+
+# Gremlin server status codes of timeouts and overloads.
+UNAVAILABLE_STATUS_CODES = {429, 503, 598}
+
+
+def is_unavailable_error(exception: BaseException) -> bool:
+    """
+    Returns whether exception signals that the server is unavailable (a connection error, a timeout or
+    an overload), as opposed to an error caused by the traversal itself (e.g. a malformed query).
+
+    :param exception: (BaseException)
+    :return: (bool)
+    """
+
+    if is_connection_error(exception):
+        return True
+
+    if getattr(exception, "status_code", None) in UNAVAILABLE_STATUS_CODES:
+        return True
+
+    message = str(exception)
+
+    return any(code in message for code in UNAVAILABLE_ERROR_CODES)
@@ -0,0 +1,67 @@
+from typing import Any, Callable, Hashable
+from threading import Event, Lock
+
+
+class Call:
+
+    def __init__(self):
+        """
+        An in-flight call, shared by the callers of the same key.
+        """
+
+        self.event = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+
+    def __init__(self):
+        """
+        Single-flight group constructor. Concurrent calls sharing a key are deduplicated: the first
+        caller executes the call and the other callers wait for (and share) its result.
+        """
+
+        self._calls = {}
+        self._lock = Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Executes func, unless a call with the same key is in flight, in which case the result
+        (or the error) of that call is returned.
+
+        :param key: (Hashable)
+        :param func: (Callable)
+        :return: (Any)
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = self._calls[key] = Call()
+
+        if not leader:
+            call.event.wait()
+
+            if call.error is not None:
+                raise call.error
+
+            return call.result
+
+        try:
+            call.result = func()
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+            call.event.set()
+
+        return call.result
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -1 +1,3 @@
-from appsync_gremlin.helpers.Exceptions import AppSyncException
\ No newline at end of file
+from appsync_gremlin.helpers.Exceptions import AppSyncException, is_connection_error, is_unavailable_error
+from appsync_gremlin.helpers.Cache import TTLCache, cache_key
+from appsync_gremlin.helpers.SingleFlight import SingleFlight
@@ -8,6 +8,10 @@ from gremlin_python.process.traversal import T
 
 from appsync_gremlin.resolver.ResolverInput import ResolverInput
 from appsync_gremlin.filter.Filter import TraversalFilterFunction
+from appsync_gremlin.sort.Sort import TraversalSortFunction
+from appsync_gremlin.facet.Facet import TraversalFacetFunction, format_facets
+from appsync_gremlin.cost.Cost import CostBudget
+from appsync_gremlin.helpers.Cache import TTLCache, cache_key
 
 
 ### Helpers
@@ -76,20 +80,35 @@ def get_range(page: int, per_page: int) -> Tuple[int, int]:
     return (page - 1) * per_page, page * per_page
 
 
-def paginate(response: List[Dict], page: int, per_page: int, total: int) -> Dict:
+def paginate(response: List[Dict], page: int, per_page: int, total: int, facets: Optional[List[Dict]] = None) -> Dict:
 
-    return {
+    pagination = {
         "data": response,
         "page": page,
         "per_page": per_page,
         "total": ceil(total/per_page)
     }
 
+    if facets is not None:
+        pagination["facets"] = facets
+
+    return pagination
+
 
 def select_current_vertex(traversal: GraphTraversal) -> GraphTraversal:
 
     return traversal.valueMap(True).by(unfold())
 
+
+def get_source_id(resolver_input: ResolverInput) -> Any:
+
+    return resolver_input.source.get("id")
+
+
+def get_aggregate_key(resolver_input: ResolverInput) -> str:
+
+    return cache_key(resolver_input.arguments, resolver_input.identity)
+
 ### Types
 
 
@@ -98,6 +117,11 @@ VertexListFieldResolverFunction = Callable[[GraphTraversal, ResolverInput], Dict
 VertexFieldResolverFunction = Callable[[GraphTraversal, ResolverInput], Optional[Dict]]
 CalculatedFieldResolverFunction = Callable[[GraphTraversal, ResolverInput], Any]
 ResolverFunction = Callable[[GraphTraversal, ResolverInput], Any]
+DecodeFunction = Callable[[List], Any]
+BranchFunction = Callable[[ResolverInput], Tuple[GraphTraversal, DecodeFunction]]
+BatchResolverFunction = Callable[[GraphTraversal, List[ResolverInput]], List[Any]]
+SourceIdFunction = Callable[[ResolverInput], Any]
+CacheKeyFunction = Callable[[ResolverInput], str]
 FormatFunction = Callable[[Dict], Dict]
 TraversalSelectionFunction = Callable[[GraphTraversal], GraphTraversal]
 
@@ -107,11 +131,33 @@ TraversalSelectionFunction = Callable[[GraphTraversal], GraphTraversal]
 def vertex_list_field_resolver(
         filter: TraversalFilterFunction,
         select: TraversalSelectionFunction = select_current_vertex,
-        format: FormatFunction = format_value_map
+        format: FormatFunction = format_value_map,
+        sort: Optional[TraversalSortFunction] = None,
+        facets: Optional[TraversalFacetFunction] = None,
+        budget: Optional[CostBudget] = None
 ) -> Callable:
     """
 
+    The page and the total are computed from the folded list of filtered vertices:
+
+        g.fold().project("data", "total").select("data", "total").
+            by(unfold().range(first, last).<select>.fold()).
+            by(unfold().count())
+
+    so the selection (by default valueMap) is only applied to the vertices of the page.
+
     :param filter_func:
+    :param sort: The sort applied to the "sort" argument (see vertex_sort). If the argument is supplied,
+                 the page is computed as an ordered top-k of the filtered vertices:
+
+                    g.fold().project("data", "total").select("data", "total").
+                        by(unfold().order().by(k_1, d_1). ... .by(T.id, asc).range(first, last).fold()).
+                        by(unfold().count())
+
+    :param facets: The facets applied to the "facets" argument (see vertex_facets). If the argument is supplied,
+                   the facets are computed from the same folded list of filtered vertices as the page.
+    :param budget: If set, the cost of the filter input and pagination is estimated before the traversal is
+                   built, and expensive queries are rejected (or their per_page clamped).
     :return:
     """
 
@@ -137,19 +183,44 @@ def vertex_list_field_resolver(
                 "per_page": 10
             })
 
+            sort_inputs = resolver_input.arguments.get("sort") if sort is not None else None
+            facet_inputs = resolver_input.arguments.get("facets") if facets is not None else None
+
+            if budget is not None:
+                pagination_info = budget.admit(input_dict, pagination_info, sort_inputs, facet_inputs)
+
             page, per_page = pagination_info.get("page"), pagination_info.get("per_page")
             first, last = get_range(page, per_page)
 
             traversal = traversal_func(traversal, resolver_input)
             traversal = filter(traversal, input_dict)
-            traversal = select(traversal)
 
-            response_and_total = traversal.fold().project("data", "total").select("data", "total").\
-                by(__.unfold().range(first, last).fold()).by(__.unfold().count()).next()
+            # The selection is only applied to the vertices of the page, not to every filtered vertex.
+            page_traversal = __.unfold()
+
+            if sort_inputs:
+                page_traversal = sort(page_traversal, sort_inputs)
+
+            page_traversal = select(page_traversal.range(first, last)).fold()
+            keys = ["data", "total"] + (["facets"] if facet_inputs else [])
+
+            traversal = traversal.fold().project(*keys).select(*keys).\
+                by(page_traversal).by(__.unfold().count())
+
+            if facet_inputs:
+                traversal = traversal.by(facets(__, facet_inputs))
+
+            response_and_total = traversal.next()
 
             response = [format(value_map) for value_map in response_and_total.get("data")]
 
-            return paginate(response, page, per_page, response_and_total.get("total"))
+            return paginate(
+                response, page, per_page, response_and_total.get("total"),
+                format_facets(facet_inputs, response_and_total.get("facets"), format_value) if facet_inputs else None
+            )
+
+        handler.filter = filter
+        handler.read_only = True
 
         return handler
 
@@ -185,6 +256,25 @@ def vertex_field_resolver(
 
             return None
 
+        def branch(resolver_input: ResolverInput) -> Tuple[GraphTraversal, DecodeFunction]:
+            """
+            Builds the resolver as an anonymous branch traversal, allowing it to be fused with
+            other branches into a single submitted traversal. The branch folds at most one value map.
+
+            :param resolver_input:
+            :return: The branch traversal and the function decoding its folded result. (GraphTraversal, DecodeFunction)
+            """
+
+            traversal = select(traversal_func(__, resolver_input)).limit(1).fold()
+
+            def decode(values: List) -> Optional[Dict]:
+                return format(values[0]) if values else None
+
+            return traversal, decode
+
+        handler.branch = branch
+        handler.read_only = True
+
         return handler
 
     return wrapper
@@ -209,9 +299,151 @@ def calculated_field_resolver(traversal_func: TraversalResolverFunction) -> Calc
         traversal = traversal_func(traversal, resolver_input)
         return traversal.next()
 
+    def branch(resolver_input: ResolverInput) -> Tuple[GraphTraversal, DecodeFunction]:
+        """
+        Builds the resolver as an anonymous branch traversal, allowing it to be fused with
+        other branches into a single submitted traversal. The branch folds at most one value.
+
+        :param resolver_input:
+        :return: The branch traversal and the function decoding its folded result. (GraphTraversal, DecodeFunction)
+        """
+
+        traversal = traversal_func(__, resolver_input).limit(1).fold()
+
+        def decode(values: List) -> Any:
+            if not values:
+                raise StopIteration
+
+            return values[0]
+
+        return traversal, decode
+
+    handler.branch = branch
+    handler.read_only = True
+
     return handler
 
 
+def aggregate_field_resolver(
+        ttl: float = 0,
+        source_id: SourceIdFunction = get_source_id,
+        max_size: int = 10000,
+        key: CacheKeyFunction = get_aggregate_key
+) -> Callable:
+    """
+    A batched and cached variant of the calculated_field_resolver. The decorated traversal function
+    receives an anonymous traversal positioned at the source vertex and returns the aggregate
+    traversal (e.g. traversal.in_("FOLLOWS").count()). The aggregate should end in a reducing step,
+    otherwise the values are folded into a list.
+
+    For a batch of sources with ids v_1, v_2, ..., v_n, the aggregates are computed by the single traversal
+
+        g.V(v_1, v_2, ..., v_n).group().by(T.id).by(a)
+
+    where a is the aggregate traversal. Sources sharing the same key (by default their arguments and identity)
+    are grouped together, and a is built from the resolver input of the first source of each group. Hence the
+    traversal function must only depend on the source id and on what key returns: a traversal function that
+    reads other source fields must include them in key, and one that does not depend on the identity may
+    exclude it (e.g. key=lambda resolver_input: cache_key(resolver_input.arguments)) so its aggregates are
+    shared between users.
+
+    The aggregate of a source whose vertex does not exist is that of an empty traversal (e.g. 0 for count()),
+    as returned by the calculated_field_resolver. The aggregate of each source is then stored in a TTL cache,
+    keyed by its vertex id and key, so that it is served from memory for at most ttl seconds.
+
+    A source whose id or key cannot be computed resolves to the raised error, the other sources are unaffected.
+
+    :param ttl: The staleness bound of a cached aggregate in seconds. A ttl <= 0 disables the cache. (float)
+    :param source_id: The function returning the vertex id of the source. (SourceIdFunction)
+    :param max_size: The maximum number of cached aggregates. (int)
+    :param key: The function returning what, besides the source id, the aggregate depends on. (CacheKeyFunction)
+    :return:
+    """
+
+    def wrapper(traversal_func: TraversalResolverFunction) -> CalculatedFieldResolverFunction:
+        """
+
+        :param traversal_func:
+        :return:
+        """
+
+        cache = TTLCache(ttl, max_size)
+
+        def batch(traversal: GraphTraversal, resolver_inputs: List[ResolverInput]) -> List[Any]:
+            """
+            Returns the aggregate of each resolver input, or the exception raised while computing its id or key.
+
+            :param traversal:
+            :param resolver_inputs:
+            :return:
+            """
+
+            responses = [None] * len(resolver_inputs)
+            vertex_ids = [None] * len(resolver_inputs)
+            missing = {}
+            miss = object()
+
+            for index, resolver_input in enumerate(resolver_inputs):
+                try:
+                    vertex_ids[index] = source_id(resolver_input)
+                    aggregate_key = key(resolver_input)
+                except Exception as error:
+                    responses[index] = error
+                    continue
+
+                value = cache.get((vertex_ids[index], aggregate_key), miss)
+
+                if value is miss:
+                    missing.setdefault(aggregate_key, []).append(index)
+                else:
+                    responses[index] = value
+
+            for aggregate_key, indices in missing.items():
+                resolver_input = resolver_inputs[indices[0]]
+                group_ids = list({vertex_ids[index]: None for index in indices})
+
+                aggregates = traversal.V(*group_ids).group().by(T.id).by(traversal_func(__, resolver_input)).next()
+
+                if len(aggregates) < len(group_ids):
+                    # The aggregate of an empty traversal, e.g. 0 for count() and [] for fold().
+                    empty = traversal_func(traversal.inject(0).limit(0), resolver_input).toList()
+
+                    for vertex_id in group_ids:
+                        aggregates.setdefault(vertex_id, empty[0] if len(empty) == 1 else empty)
+
+                for vertex_id in group_ids:
+                    cache.set((vertex_id, aggregate_key), aggregates.get(vertex_id))
+
+                for index in indices:
+                    responses[index] = aggregates.get(vertex_ids[index])
+
+            return responses
+
+        @functools.wraps(traversal_func)
+        def handler(traversal: GraphTraversal, resolver_input: ResolverInput) -> Any:
+            """
+
+            :param traversal:
+            :param resolver_input:
+            :return:
+            """
+
+            response = batch(traversal, [resolver_input])[0]
+
+            if isinstance(response, Exception):
+                raise response
+
+            return response
+
+        handler.batch = batch
+        handler.cache = cache
+        handler.read_only = True
+
+        return handler
+
+    return wrapper
+
+
 def mutation_resolver(
         format: FormatFunction = format_value_map,
         select: TraversalSelectionFunction = select_current_vertex
@@ -3,6 +3,9 @@ from typing import Optional, Dict
 
 class ResolverInput:
 
+    # A resolver input only holds a reference to its payload dictionary, the fields are read from it on access.
+    __slots__ = ("_payload",)
+
     def __init__(self, type_name: str, field_name: str, arguments: Dict, identity: Optional[Dict], source: Optional[Dict]):
         """
         Resolver Input Constructor
@@ -15,11 +18,27 @@ class ResolverInput:
         :returns
         """
 
-        self._type_name = type_name
-        self._field_name = field_name
-        self._arguments = arguments
-        self._identity = identity
-        self._source = source
+        self._payload = {
+            "type_name": type_name,
+            "field_name": field_name,
+            "arguments": arguments,
+            "identity": identity,
+            "source": source
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Dict) -> "ResolverInput":
+        """
+        Wraps an Invoke payload (or an item of a BatchInvoke payload) without copying it.
+
+        :param payload: A dictionary with the type_name, field_name, arguments, identity and source keys. (dict)
+        :return: (ResolverInput)
+        """
+
+        resolver_input = cls.__new__(cls)
+        resolver_input._payload = payload
+
+        return resolver_input
 
     @property
     def type_name(self) -> str:
@@ -28,7 +47,7 @@ class ResolverInput:
         :return:
         """
 
-        return self._type_name
+        return self._payload.get("type_name")
 
     @property
     def field_name(self) -> str:
@@ -37,7 +56,7 @@ class ResolverInput:
         :return:
         """
 
-        return self._field_name
+        return self._payload.get("field_name")
 
     @property
     def arguments(self) -> Dict:
@@ -46,7 +65,7 @@ class ResolverInput:
         :return:
         """
 
-        return self._arguments
+        return self._payload.get("arguments")
 
     @property
     def identity(self) -> Optional[Dict]:
@@ -55,7 +74,7 @@ class ResolverInput:
         :return:
         """
 
-        return self._identity
+        return self._payload.get("identity")
 
     @property
     def source(self) -> Optional[Dict]:
@@ -64,7 +83,7 @@ class ResolverInput:
         :return:
         """
 
-        return self._source
+        return self._payload.get("source")
 
     def __str__(self) -> str:
         return "ResolverInput: type_name = {}, field_name = {}, arguments = {}, identity = {}, source = {}".format(
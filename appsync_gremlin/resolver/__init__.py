@@ -1,7 +1,8 @@
 from appsync_gremlin.resolver.Resolver import (
     TraversalFilterFunction, VertexListFieldResolverFunction, VertexFieldResolverFunction, CalculatedFieldResolverFunction,
-    ResolverFunction,
-    vertex_field_resolver, vertex_list_field_resolver, calculated_field_resolver, mutation_resolver,
+    ResolverFunction, BranchFunction, DecodeFunction, BatchResolverFunction, SourceIdFunction, CacheKeyFunction,
+    vertex_field_resolver, vertex_list_field_resolver, calculated_field_resolver, aggregate_field_resolver,
+    mutation_resolver,
     format_value_map, format_key, format_value
 )
 from appsync_gremlin.resolver.ResolverInput import ResolverInput
\ No newline at end of file
@@ -0,0 +1,109 @@
+from typing import Dict, List, Any, Callable
+from enum import Enum
+import functools
+
+from gremlin_python.process.graph_traversal import GraphTraversal
+from gremlin_python.process.traversal import T, Order
+
+from appsync_gremlin.helpers.Exceptions import AppSyncException
+
+
+###
+
+
+class SortDirection(Enum):
+    """
+    Sort direction.
+    Supported options are ASC and DESC.
+    """
+
+    ASC = 0
+    DESC = 1
+
+
+SORT_DIRECTION_MAP = {
+    SortDirection.ASC: Order.asc,
+    SortDirection.DESC: Order.desc
+}
+
+
+### Types
+
+
+TraversalSortFunction = Callable[[GraphTraversal, List[Dict]], GraphTraversal]
+SortFieldsFunction = Callable[[], Dict[str, Any]]
+
+
+### Sorts
+
+
+def vertex_sort(fields_func: SortFieldsFunction) -> TraversalSortFunction:
+    """
+    Vertex sort decorator. This decorator decorates a function that returns a dictionary
+    that maps the sortable GraphQL fields to Gremlin property keys (or T.id).
+
+    Using this dictionary we construct a sort_func that orders the supplied traversal g by the
+    sort inputs [(f_1, d_1), (f_2, d_2), ..., (f_n, d_n)], producing a traversal with the general form:
+
+        g' = g.order().by(k_1, d_1).by(k_2, d_2). ... .by(k_n, d_n).by(T.id, asc)
+
+    where k_1, k_2, ..., k_n are the property keys of the fields f_1, f_2, ..., f_n. The final
+    by(T.id, asc) is a stable tie-break, so that pages of equal sort keys never overlap. It is omitted
+    if the traversal is already ordered by T.id.
+
+        @vertex_sort
+        def user_sort():
+            return {
+                "id": T.id,
+                "name": "name",
+                "created_at": "created_at"
+            }
+
+    Note that every vertex must have the sort properties.
+
+    :param fields_func: The function that returns the dictionary that maps GraphQL
+                        field names to property keys. (SortFieldsFunction)
+    :return: (TraversalSortFunction)
+    """
+
+    @functools.wraps(fields_func)
+    def sort_func(traversal: GraphTraversal, sort_inputs: List[Dict]) -> GraphTraversal:
+        """
+        This is the sort_func for a vertex sort.
+
+        :param traversal: (GraphTraversal)
+        :param sort_inputs: A list of sort inputs of the form {"field": ..., "direction": "ASC" | "DESC"} (List[Dict])
+        :return: (GraphTraversal)
+        """
+
+        fields = fields_func()
+
+        traversal = traversal.order()
+        tie_break = True
+
+        for sort_input in sort_inputs:
+            field_name = sort_input.get("field")
+            direction = sort_input.get("direction") or SortDirection.ASC.name
+
+            if field_name not in fields or direction not in SortDirection.__members__:
+                raise AppSyncException(
+                    error_type="BAD_REQUEST",
+                    error_message="Unable to sort by {} {}.".format(field_name, direction),
+                    error_data={
+                        "field": field_name,
+                        "direction": direction
+                    }
+                )
+
+            key = fields.get(field_name)
+            traversal = traversal.by(key, SORT_DIRECTION_MAP[SortDirection[direction]])
+
+            if key == T.id:
+                tie_break = False
+
+        if tie_break:
+            traversal = traversal.by(T.id, Order.asc)
+
+        return traversal
+
+    return sort_func
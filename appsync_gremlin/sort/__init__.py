@@ -0,0 +1 @@
+from appsync_gremlin.sort.Sort import SortDirection, vertex_sort, TraversalSortFunction, SortFieldsFunction
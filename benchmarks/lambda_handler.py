@@ -0,0 +1,129 @@
+"""
+End to end benchmark of AppSync.lambda_handler over a LocalGraph.
+
+Builds a synthetic social graph of User vertices connected by FOLLOWS edges and times
+the Invoke and BatchInvoke operations of a few typical resolvers.
+
+Run from the repository root (or after pip install -e .):
+
+    python -m benchmarks.lambda_handler --users 1000000 --follows 5 --latency 0.002
+"""
+
+from typing import Callable, Any
+import argparse
+import random
+import time
+
+from gremlin_python.process.graph_traversal import GraphTraversal
+from gremlin_python.process.traversal import T
+
+from appsync_gremlin import (
+    AppSync, ResolverInput, LocalGraph, LocalRemoteConnection,
+    name, vertex_filter, relationship_filter, RelationshipDirection, id_filter, string_filter, int_filter,
+    vertex_list_field_resolver, vertex_field_resolver, calculated_field_resolver
+)
+
+
+@name("User")
+@vertex_filter
+def user_filter():
+    return {
+        "id": id_filter(T.id),
+        "name": string_filter("name"),
+        "age": int_filter("age"),
+        "following": relationship_filter(("FOLLOWS", RelationshipDirection.OUT), user_filter),
+        "followed_by": relationship_filter(("FOLLOWS", RelationshipDirection.IN), user_filter)
+    }
+
+
+@vertex_list_field_resolver(filter=user_filter)
+def users(traversal: GraphTraversal, resolver_input: ResolverInput) -> GraphTraversal:
+    return traversal.V()
+
+
+@vertex_field_resolver()
+def user(traversal: GraphTraversal, resolver_input: ResolverInput) -> GraphTraversal:
+    return traversal.V(resolver_input.arguments.get("id"))
+
+
+@calculated_field_resolver
+def following_count(traversal: GraphTraversal, resolver_input: ResolverInput) -> GraphTraversal:
+    return traversal.V(resolver_input.source.get("id")).out("FOLLOWS").count()
+
+
+def build_graph(user_count: int, follow_count: int) -> LocalGraph:
+
+    graph = LocalGraph(indexed_properties=["name"])
+    vertices = [
+        graph.add_vertex("User", {"name": "user_{}".format(i), "age": i % 80}) for i in range(user_count)
+    ]
+
+    for vertex in vertices:
+        for _ in range(follow_count):
+            graph.add_edge("FOLLOWS", vertex, random.choice(vertices))
+
+    return graph
+
+
+def build_app(connection: LocalRemoteConnection, **kwargs: Any) -> AppSync:
+
+    app = AppSync({}, remote_connection=connection, **kwargs)
+    app.add_resolver(("Query", "users"), users)
+    app.add_resolver(("Query", "user"), user)
+    app.add_resolver(("User", "following_count"), following_count)
+
+    return app
+
+
+def measure(label: str, handler: Callable, payload: Any, repeat: int) -> None:
+
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        handler(payload, None)
+
+    elapsed = (time.perf_counter() - start) / repeat
+    print("{:<40} {:>10.2f} ms".format(label, elapsed * 1000))
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--follows", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.002, help="Simulated round trip latency (seconds).")
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    arguments = parser.parse_args()
+
+    start = time.perf_counter()
+    graph = build_graph(arguments.users, arguments.follows)
+    print("Built graph with {} vertices and {} edges in {:.1f} s".format(
+        graph.vertex_count, graph.edge_count, time.perf_counter() - start
+    ))
+
+    connection = LocalRemoteConnection(graph, latency=arguments.latency)
+    ids = [vertex.id for vertex in random.sample(list(graph.vertices()), arguments.batch)]
+
+    invoke = {
+        "type_name": "Query",
+        "field_name": "users",
+        "arguments": {
+            "input": {"name": {"eq": "user_42"}, "following": {"age": {"lt": 40}}},
+            "pagination": {"page": 1, "per_page": 10}
+        }
+    }
+    batch = [
+        {"type_name": "User", "field_name": "following_count", "arguments": {}, "source": {"id": i}} for i in ids
+    ]
+
+    measure("Invoke users (indexed name filter)", build_app(connection).lambda_handler(), invoke, arguments.repeat)
+    measure("BatchInvoke following_count", build_app(connection).lambda_handler(), batch, arguments.repeat)
+    measure(
+        "BatchInvoke following_count (fused)",
+        build_app(connection, fuse_batches=True).lambda_handler(), batch, arguments.repeat
+    )
+
+
+if __name__ == "__main__":
+    main()
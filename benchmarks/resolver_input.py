@@ -0,0 +1,98 @@
+"""
+Benchmark of ResolverInput construction and AppSync.lambda_handler on large BatchInvoke payloads
+with large source dictionaries, comparing the eager (copying) construction of the resolver inputs
+with the payload wrapping ResolverInput.from_payload.
+
+Run from the repository root (or after pip install -e .):
+
+    python -m benchmarks.resolver_input --batch 1000 --source-size 200
+"""
+
+from typing import Any, Callable, Dict, List
+import argparse
+import logging
+import time
+import tracemalloc
+
+from gremlin_python.process.graph_traversal import GraphTraversal
+
+from appsync_gremlin import AppSync, ResolverInput, LocalGraph, LocalRemoteConnection
+
+
+def eager(item: Dict) -> ResolverInput:
+
+    return ResolverInput(
+        type_name=item.get("type_name"),
+        field_name=item.get("field_name"),
+        arguments=item.get("arguments"),
+        identity=item.get("identity"),
+        source=item.get("source")
+    )
+
+
+def source_id(traversal: GraphTraversal, resolver_input: ResolverInput) -> Any:
+    return resolver_input.source.get("id")
+
+
+def build_payload(batch_size: int, source_size: int) -> List[Dict]:
+
+    return [
+        {
+            "type_name": "User",
+            "field_name": "source_id",
+            "arguments": {},
+            "identity": {"sub": "user", "claims": {"scope": "read"}},
+            "source": dict({"id": i}, **{"field_{}".format(j): "value_{}".format(j) * 4 for j in range(source_size)})
+        }
+        for i in range(batch_size)
+    ]
+
+
+def measure(label: str, func: Callable[[], Any], repeat: int) -> None:
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        func()
+
+    elapsed = (time.perf_counter() - start) / repeat
+    print("{:<50} {:>10.2f} ms {:>10.1f} KiB".format(label, elapsed * 1000, peak / 1024))
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--source-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    arguments = parser.parse_args()
+
+    payload = build_payload(arguments.batch, arguments.source_size)
+
+    measure("ResolverInput(...) per item", lambda: [eager(item) for item in payload], arguments.repeat)
+    measure(
+        "ResolverInput.from_payload per item",
+        lambda: [ResolverInput.from_payload(item) for item in payload], arguments.repeat
+    )
+
+    logger = logging.getLogger("benchmark")
+    logger.addHandler(logging.NullHandler())
+    logger.setLevel(logging.WARNING)
+
+    app = AppSync({}, logger=logger, remote_connection=LocalRemoteConnection(LocalGraph()))
+    app.add_resolver(("User", "source_id"), source_id)
+    handler = app.lambda_handler()
+
+    measure("BatchInvoke (logger at WARNING)", lambda: handler(payload, None), arguments.repeat)
+
+    logger.setLevel(logging.INFO)
+    measure("BatchInvoke (logger at INFO)", lambda: handler(payload, None), arguments.repeat)
+
+
+if __name__ == "__main__":
+    main()
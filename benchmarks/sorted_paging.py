@@ -0,0 +1,96 @@
+"""
+Benchmark of sorted (ordered top-k) paging against unsorted paging in vertex_list_field_resolver,
+over a LocalGraph with a large label set.
+
+Run from the repository root (or after pip install -e .):
+
+    python -m benchmarks.sorted_paging --users 1000000
+"""
+
+from typing import Any, Dict
+import argparse
+import random
+import time
+
+from gremlin_python.process.anonymous_traversal import traversal
+from gremlin_python.process.graph_traversal import GraphTraversal
+from gremlin_python.process.traversal import T
+
+from appsync_gremlin import (
+    ResolverInput, LocalGraph, LocalRemoteConnection,
+    name, vertex_filter, id_filter, string_filter, int_filter, vertex_sort, vertex_list_field_resolver
+)
+
+
+@name("User")
+@vertex_filter
+def user_filter():
+    return {
+        "id": id_filter(T.id),
+        "name": string_filter("name"),
+        "age": int_filter("age")
+    }
+
+
+@vertex_sort
+def user_sort():
+    return {
+        "id": T.id,
+        "name": "name",
+        "age": "age",
+        "created_at": "created_at"
+    }
+
+
+@vertex_list_field_resolver(filter=user_filter, sort=user_sort)
+def users(traversal: GraphTraversal, resolver_input: ResolverInput) -> GraphTraversal:
+    return traversal.V()
+
+
+def measure(label: str, g: Any, arguments: Dict, repeat: int) -> None:
+
+    resolver_input = ResolverInput(type_name="Query", field_name="users", arguments=arguments, identity=None, source=None)
+
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        users(g, resolver_input)
+
+    elapsed = (time.perf_counter() - start) / repeat
+    print("{:<50} {:>10.2f} ms".format(label, elapsed * 1000))
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--per-page", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    arguments = parser.parse_args()
+
+    graph = LocalGraph(indexed_properties=[])
+
+    for i in range(arguments.users):
+        graph.add_vertex("User", {"name": "user_{}".format(i), "age": i % 80, "created_at": random.random()})
+
+    g = traversal().withRemote(LocalRemoteConnection(graph))
+    last_page = arguments.users // arguments.per_page
+
+    for page in (1, last_page // 2):
+        pagination = {"page": page, "per_page": arguments.per_page}
+
+        measure("unsorted, page {}".format(page), g, {"pagination": pagination}, arguments.repeat)
+        measure(
+            "sorted by created_at DESC, page {}".format(page), g,
+            {"pagination": pagination, "sort": [{"field": "created_at", "direction": "DESC"}]},
+            arguments.repeat
+        )
+        measure(
+            "sorted by age ASC (ties on id), page {}".format(page), g,
+            {"pagination": pagination, "sort": [{"field": "age", "direction": "ASC"}]},
+            arguments.repeat
+        )
+
+
+if __name__ == "__main__":
+    main()
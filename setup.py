@@ -9,9 +9,13 @@ requires = [
 
 packages = [
     "appsync_gremlin",
+    "appsync_gremlin.connection",
+    "appsync_gremlin.cost",
+    "appsync_gremlin.facet",
     "appsync_gremlin.filter",
     "appsync_gremlin.helpers",
-    "appsync_gremlin.resolver"
+    "appsync_gremlin.resolver",
+    "appsync_gremlin.sort"
 ]
 
 setuptools.setup(